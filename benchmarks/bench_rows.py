@@ -0,0 +1,99 @@
+""""""
+
+# Standard library modules.
+import dataclasses
+import datetime
+import timeit
+
+# Third party modules.
+
+# Local modules.
+from dataclasses_sql.base import get_mapping
+
+# Globals and constants variables.
+
+
+@dataclasses.dataclass
+class TaxonomyData:
+    kingdom: str = dataclasses.field(metadata={"key": True})
+    order: str = dataclasses.field(metadata={"key": True})
+    family: str = dataclasses.field(metadata={"key": True})
+    genus: str = dataclasses.field(metadata={"key": True})
+
+
+@dataclasses.dataclass
+class TreeData:
+    serial_number: int = dataclasses.field(metadata={"key": True})
+    taxonomy: TaxonomyData = dataclasses.field(metadata={"key": True})
+    specie: str = dataclasses.field(metadata={"key": True})
+    diameter_m: float = None
+    long_description: bytes = None
+    has_flower: bool = None
+    plantation_datetime: datetime.datetime = None
+    last_pruning_date: datetime.date = None
+
+
+def to_row_loop(data):
+    row = {}
+    for field in dataclasses.fields(data):
+        name = field.name
+        value = getattr(data, name)
+
+        if dataclasses.is_dataclass(value):
+            row[name + "_id"] = int(value._rowid)
+        else:
+            row[name] = value
+
+    return row
+
+
+def from_row_loop(dataclass, row, nested):
+    kwargs = {}
+    index = 1
+    for field in dataclasses.fields(dataclass):
+        if dataclasses.is_dataclass(field.type):
+            kwargs[field.name] = nested[field.name]
+        else:
+            kwargs[field.name] = row[index]
+        index += 1
+
+    data = dataclass(**kwargs)
+    data._rowid = row[0]
+    return data
+
+
+def main():
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    taxonomy._rowid = 1
+    data = TreeData(
+        1,
+        taxonomy,
+        "Hibiscus abelmoschus",
+        diameter_m=3.0,
+        long_description=b"Hibiscus is a genus of flowering plants.",
+        has_flower=True,
+        plantation_datetime=datetime.datetime(2019, 7, 21, 18, 54, 21),
+        last_pruning_date=datetime.date(2019, 8, 1),
+    )
+
+    mapping = get_mapping(TreeData)
+    row = (1,) + tuple(mapping.to_row(data).values())
+    number = 100000
+
+    benchmarks = [
+        ("to_row (loop)", lambda: to_row_loop(data)),
+        ("to_row (generated)", lambda: mapping.to_row(data)),
+        (
+            "from_row (loop)",
+            lambda: from_row_loop(TreeData, row, {"taxonomy": taxonomy}),
+        ),
+        ("from_row (generated)", lambda: mapping.from_row(row, (taxonomy,))),
+    ]
+
+    for name, func in benchmarks:
+        duration = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{name:<22} {duration / number * 1e6:.3f} us per row")
+
+
+if __name__ == "__main__":
+    main()
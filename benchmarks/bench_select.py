@@ -0,0 +1,60 @@
+""""""
+
+# Standard library modules.
+import timeit
+
+# Third party modules.
+import sqlalchemy
+
+# Local modules.
+import dataclasses_sql
+from bench_rows import TaxonomyData, TreeData
+
+# Globals and constants variables.
+
+
+def create_builder(serial_number):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_all_columns(TreeData)
+    builder.add_join(TreeData, TaxonomyData)
+    builder.add_clause(TreeData, "serial_number", serial_number)
+    builder.add_clause(TaxonomyData, "genus", ["hibiscus", "rosa"], "in")
+    return builder
+
+
+def main():
+    engine = sqlalchemy.create_engine("sqlite:///:memory:")
+    metadata = sqlalchemy.MetaData(engine)
+
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    trees = [TreeData(i, taxonomy, "Hibiscus abelmoschus") for i in range(100)]
+    dataclasses_sql.insert_many(metadata, trees)
+
+    cache = dataclasses_sql.SelectStatementBuilder.statement_cache
+    number = 2000
+
+    with engine.connect() as conn:
+
+        def uncached():
+            cache.clear()
+            statement, params = create_builder(42).prepare(metadata)
+            conn.execute(statement, params).fetchall()
+
+        def cached():
+            statement, params = create_builder(42).prepare(metadata)
+            conn.execute(statement, params).fetchall()
+
+        benchmarks = [
+            ("build + execute (no statement cache)", uncached),
+            ("prepare + execute (statement cache)", cached),
+        ]
+
+        for name, func in benchmarks:
+            duration = min(timeit.repeat(func, number=number, repeat=5))
+            print(f"{name:<40} {duration / number * 1e6:.1f} us per query")
+
+    print(f"Statement cache: {cache.hits} hits, {cache.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,29 @@ del get_versions
 
 __all__ = [
     "require_table",
+    "require_key_index",
+    "require_indexes",
+    "Index",
     "insert",
+    "insert_many",
     "exists",
+    "exists_many",
+    "get_rowid",
+    "get_rowids",
     "SelectStatementBuilder",
+    "select_objects",
     "update",
+    "update_many",
     "delete",
+    "delete_many",
+    "delete_where",
+    "upsert",
+    "upsert_many",
+    "Session",
+    "enable_identity_map",
+    "disable_identity_map",
+    "enable_result_cache",
+    "disable_result_cache",
 ]
 
 # Standard library modules.
@@ -19,10 +37,25 @@ __all__ = [
 # Third party modules.
 
 # Local modules.
-from .base import require_table
-from .insert import insert, exists
-from .select import SelectStatementBuilder
-from .update import update
-from .delete import delete
+from .base import (
+    Index,
+    require_table,
+    require_key_index,
+    require_indexes,
+    get_rowid,
+    get_rowids,
+)
+from .insert import insert, insert_many, exists, exists_many
+from .select import SelectStatementBuilder, select_objects
+from .update import update, update_many
+from .delete import delete, delete_many, delete_where
+from .upsert import upsert, upsert_many
+from .session import Session
+from .cache import (
+    enable_identity_map,
+    disable_identity_map,
+    enable_result_cache,
+    disable_result_cache,
+)
 
 # Globals and constants variables.
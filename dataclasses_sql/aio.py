@@ -0,0 +1,131 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+
+# Local modules.
+from .base import DEFAULT_CHUNK_SIZE, get_mapping, _get_rowids, _Journal
+from .cache import get_identity_map
+from .insert import _insert_many
+from .update import _update_many
+from .delete import _delete_many
+
+# Globals and constants variables.
+
+
+async def insert(engine, metadata, data, check_exists=True):
+    """
+    Insert a dataclass instance into database, using an
+    :class:`~sqlalchemy.ext.asyncio.AsyncEngine`.
+    Returns ``True`` if successful.
+    """
+    if hasattr(data, "_rowid"):
+        return False
+
+    count = await insert_many(engine, metadata, [data], check_exists)
+    return count == 1
+
+
+async def insert_many(
+    engine, metadata, iterable, check_exists=True, chunk_size=DEFAULT_CHUNK_SIZE
+):
+    """
+    Insert many dataclass instances into database in a single transaction.
+    See :func:`dataclasses_sql.insert_many`.
+    Returns the number of inserted instances.
+    """
+    with _Journal(metadata) as journal:
+        async with engine.begin() as conn:
+            return await conn.run_sync(
+                _insert_many,
+                metadata,
+                list(iterable),
+                check_exists,
+                chunk_size,
+                journal,
+            )
+
+
+async def get_rowid(engine, metadata, data):
+    """
+    Returns the row of the dataclass if it exists, ``None`` otherwise.
+    """
+    if hasattr(data, "_rowid"):
+        return data._rowid
+
+    return (await get_rowids(engine, metadata, [data]))[0]
+
+
+async def get_rowids(engine, metadata, instances, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns the rows of many dataclass instances, ``None`` if not found.
+    See :func:`dataclasses_sql.get_rowids`.
+    """
+    instances = list(instances)
+
+    # Only look up the database when the identity map is not sufficient
+    if get_identity_map(metadata) is not None:
+        _get_rowids(None, metadata, instances, chunk_size)
+
+    if not all(hasattr(data, "_rowid") for data in instances if data is not None):
+        async with engine.begin() as conn:
+            await conn.run_sync(_get_rowids, metadata, instances, chunk_size)
+
+    return [getattr(data, "_rowid", None) for data in instances]
+
+
+async def update(engine, metadata, data):
+    """
+    Update a dataclass instance into database.
+    Returns ``True`` if successful, ``False`` if nothing changed.
+    """
+    with _Journal(metadata) as journal:
+        async with engine.begin() as conn:
+            count = await conn.run_sync(
+                _update_many, metadata, [data], DEFAULT_CHUNK_SIZE, journal
+            )
+
+    return count == 1
+
+
+async def delete(engine, metadata, data):
+    """
+    Remove a dataclass instance from database.
+    Returns ``True`` if successful.
+    """
+    with _Journal(metadata) as journal:
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                _delete_many, metadata, [data], DEFAULT_CHUNK_SIZE, journal
+            )
+
+    return True
+
+
+async def stream(
+    engine, metadata, builder, chunk_size=DEFAULT_CHUNK_SIZE, dataclass=None
+):
+    """
+    Yields asynchronously the rows of a
+    :class:`~dataclasses_sql.SelectStatementBuilder`, or the instances of the
+    *dataclass*, as :meth:`SelectStatementBuilder.stream` does.
+
+    Example::
+
+        async for treedata in aio.stream(engine, metadata, builder, dataclass=TreeData):
+            ...
+    """
+    if dataclass is not None and get_mapping(dataclass).get_table(metadata) is None:
+        return
+
+    statement, params, load = builder._prepare_stream(
+        metadata, dataclass
+    )  # pylint: disable=protected-access
+
+    async with engine.connect() as conn:
+        result = await conn.stream(statement, params)
+
+        async for rows in result.partitions(chunk_size):
+            for data in load(rows):
+                yield data
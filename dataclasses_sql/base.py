@@ -11,6 +11,7 @@ import sqlalchemy.sql
 from loguru import logger
 
 # Local modules.
+from .cache import get_identity_map, get_compiled_cache, get_result_cache
 
 # Globals and constants variables.
 
@@ -24,6 +25,9 @@ TYPE_TO_SQLTYPE = {
     bool: sqlalchemy.Boolean,
 }
 
+DEFAULT_CHUNK_SIZE = 500
+STATEMENTS_KEY = "dataclasses_sql.statements"
+
 
 def camelcase_to_words(text):
     return re.sub("([a-z0-9])([A-Z])", r"\1 \2", text)
@@ -34,48 +38,318 @@ def iskeyfield(field):
 
 
 def keyfields(dataclass):
-    return tuple(field for field in dataclasses.fields(dataclass) if iskeyfield(field))
+    return get_mapping(dataclass).keyfields
 
 
 def get_table_name(data_or_dataclass):
+    return get_mapping(data_or_dataclass).table_name
+
+
+class Index:
+    """
+    Declaration of an index over columns of a dataclass, in addition to the
+    index over key fields.
+    Indexes are declared in the ``__sql_indexes__`` attribute of the dataclass
+    or, for a single column, with ``dataclasses.field(metadata={"index": True})``.
+
+    Args:
+        column_names: field names of the indexed columns
+        name: name of the index, by default created from the table and column names
+        unique: whether the index is unique
+        where: SQL expression of a partial index, e.g. ``"diameter_m > 1.0"``
+        include: field names of additional columns of a covering index.
+            With dialects without ``INCLUDE``, the columns are added to the
+            indexed columns of non-unique indexes.
+    """
+
+    def __init__(self, *column_names, name=None, unique=False, where=None, include=()):
+        if not column_names:
+            raise ValueError("Index has no column")
+
+        self.column_names = column_names
+        self.name = name
+        self.unique = unique
+        self.where = where
+        self.include = tuple(include)
+
+    def __repr__(self):
+        return f"<Index({', '.join(self.column_names)})>"
+
+    def get_name(self, table_name):
+        if self.name is not None:
+            return self.name
+        return f"ix_{table_name}_{'_'.join(self.column_names)}"
+
+
+class DataclassMapping:
+    """
+    Mapping between a dataclass and its table, computed once per dataclass.
+    """
+
+    def __init__(self, dataclass):
+        self.dataclass = dataclass
+
+        name = dataclass.__name__.lower()
+        self.table_name = "_".join(camelcase_to_words(name).split())
+
+        self.fields = dataclasses.fields(dataclass)
+        self.field_names = frozenset(field.name for field in self.fields)
+        self.keyfields = tuple(field for field in self.fields if iskeyfield(field))
+        self.nested_fields = tuple(
+            field for field in self.fields if dataclasses.is_dataclass(field.type)
+        )
+        self.nested_field_names = frozenset(field.name for field in self.nested_fields)
+
+        self.column_names = ("id",) + tuple(map(self.get_column_name, self.fields))
+        self.key_column_names = tuple(map(self.get_column_name, self.keyfields))
+        self.table_clause = _create_table_clause(self)
+
+        self.indexes = tuple(
+            Index(field.name) for field in self.fields if field.metadata.get("index")
+        ) + tuple(getattr(dataclass, "__sql_indexes__", ()))
+
+        for index in self.indexes:
+            for field_name in index.column_names + index.include:
+                if field_name not in self.field_names:
+                    raise ValueError(
+                        f"Dataclass {dataclass.__name__} has no column {field_name} for {index!r}"
+                    )
+
+        self.to_row = _create_to_row(self)
+        self.from_row = _create_from_row(self)
+
+    def get_column_name(self, field_or_name):
+        name = getattr(field_or_name, "name", field_or_name)
+        if name in self.nested_field_names:
+            return name + "_id"
+        return name
+
+    def get_table(self, metadata):
+        """
+        Returns the table of the dataclass, ``None`` if it doesn't exist.
+        """
+        return metadata.tables.get(self.table_name)
+
+
+def _create_table_clause(mapping):
+    """
+    Creates a lightweight table of the dataclass, with typed columns, used when
+    its table is not known by the metadata.
+    """
+    columns = [sqlalchemy.sql.column("id", sqlalchemy.Integer)]
+    for field, column_name in zip(mapping.fields, mapping.column_names[1:]):
+        if field.name in mapping.nested_field_names:
+            column_type = sqlalchemy.Integer
+        else:
+            column_type = TYPE_TO_SQLTYPE.get(field.type)
+        columns.append(sqlalchemy.sql.column(column_name, column_type))
+
+    return sqlalchemy.sql.table(mapping.table_name, *columns)
+
+
+def _create_fn(name, args, lines, localns):
+    """
+    Creates a function from the source of its body, like the dataclasses module
+    does for ``__init__``.
+    """
+    body = "\n".join(f"    {line}" for line in lines)
+    source = f"def {name}({args}):\n{body}\n"
+
+    namespace = {}
+    exec(source, localns, namespace)  # pylint: disable=exec-used
+    return namespace[name]
+
+
+def _create_to_row(mapping):
+    """
+    Creates a function returning the row of a dataclass instance as a
+    :class:`dict`, where nested dataclasses are replaced by their rowid.
+    The nested dataclasses must already have a ``_rowid``.
+    """
+    lines = ["return {"]
+    for field, column_name in zip(mapping.fields, mapping.column_names[1:]):
+        if field.name in mapping.nested_field_names:
+            value = f"getattr(data.{field.name}, '_rowid', None)"
+        else:
+            value = f"data.{field.name}"
+        lines.append(f"    {column_name!r}: {value},")
+    lines.append("}")
+
+    return _create_fn("to_row", "data", lines, {})
+
+
+def _create_from_row(mapping):
+    """
+    Creates a function returning a dataclass instance from a row, where the
+    values are in the order of the column names of the mapping.
+    The instances of the nested dataclasses are given in the order of the
+    nested fields, ``None`` by default.
+    The values of the row are kept as the ``_snapshot`` of the instance.
+    """
+    arguments = []
+    attributes = []
+    nested_index = 0
+    for index, field in enumerate(mapping.fields, 1):
+        if field.name in mapping.nested_field_names:
+            value = f"nested[{nested_index}]"
+            nested_index += 1
+        else:
+            value = f"row[{index}]"
+
+        if field.init:
+            arguments.append(f"{field.name}={value}")
+        else:
+            attributes.append(f"data.{field.name} = {value}")
+
+    snapshot = ", ".join(
+        f"{column_name!r}: row[{index}]"
+        for index, column_name in enumerate(mapping.column_names[1:], 1)
+    )
+
+    lines = [f"data = cls({', '.join(arguments)})", *attributes]
+    lines += ["data._rowid = row[0]", f"data._snapshot = {{{snapshot}}}", "return data"]
+    args = f"row, nested={(None,) * nested_index!r}"
+
+    return _create_fn("from_row", args, lines, {"cls": mapping.dataclass})
+
+
+_MAPPINGS = {}
+
+
+def get_mapping(data_or_dataclass):
+    """
+    Returns the :class:`DataclassMapping` of a dataclass or dataclass instance.
+    """
     if not inspect.isclass(data_or_dataclass):
         data_or_dataclass = type(data_or_dataclass)
 
-    name = data_or_dataclass.__name__.lower()
-    return "_".join(camelcase_to_words(name).split())
+    mapping = _MAPPINGS.get(data_or_dataclass)
+    if mapping is None:
+        mapping = _MAPPINGS[data_or_dataclass] = DataclassMapping(data_or_dataclass)
 
+    return mapping
 
-def require_table(metadata, data_or_dataclass):
+
+class TableStatements:
+    """
+    Insert, update and delete statements of a table, built once so that they
+    are compiled once per dialect.
+    The rowid of the updated row is bound as ``_rowid`` and the rowids of the
+    deleted rows as ``_rowids``.
+    """
+
+    def __init__(self, table):
+        column = table.c.id
+        self.insert = table.insert()  # pylint: disable=no-value-for-parameter
+        self.update = table.update().where(column == sqlalchemy.sql.bindparam("_rowid"))
+        self.delete = table.delete().where(
+            column.in_(sqlalchemy.sql.bindparam("_rowids", expanding=True))
+        )
+        self.max_rowid = sqlalchemy.sql.select([sqlalchemy.sql.func.max(column)])
+
+
+def get_statements(table):
+    """
+    Returns the :class:`TableStatements` of a table.
+    """
+    statements = table.info.get(STATEMENTS_KEY)
+    if statements is None:
+        statements = table.info[STATEMENTS_KEY] = TableStatements(table)
+
+    return statements
+
+
+def _with_compiled_cache(conn, metadata):
+    """
+    Returns the connection compiling statements in the compiled cache of the
+    *metadata*.
+    """
+    return conn.execution_options(compiled_cache=get_compiled_cache(metadata))
+
+
+def sort_dataclasses(dataclasses_):
+    """
+    Returns the dataclasses and their nested dataclasses, sorted so that nested
+    dataclasses come before the dataclasses containing them.
+    Raises :class:`ValueError` if the nested dataclasses form a cycle.
+    """
+    ordered = []
+    visited = set()
+    path = []
+
+    def visit(dataclass):
+        if dataclass in path:
+            cycle = path[path.index(dataclass) :] + [dataclass]
+            cycle_str = " -> ".join(dataclass.__name__ for dataclass in cycle)
+            raise ValueError(f"Cycle between nested dataclasses: {cycle_str}")
+
+        if dataclass in visited:
+            return
+        visited.add(dataclass)
+
+        path.append(dataclass)
+        for field in get_mapping(dataclass).nested_fields:
+            visit(field.type)
+        path.pop()
+
+        ordered.append(dataclass)
+
+    for dataclass in dataclasses_:
+        visit(dataclass)
+
+    return ordered
+
+
+def require_table(metadata, data_or_dataclass, bind=None, unique_keys=False):
     """
     Creates a table based on the dataclass, if it doesn't already exist in the database.
+    If *bind* is ``None``, the table is created using ``metadata.bind``.
+    An index is created over the key fields, unique if *unique_keys* is ``True``.
     """
-    table_name = get_table_name(data_or_dataclass)
-    table = metadata.tables.get(table_name)
+    mapping = get_mapping(data_or_dataclass)
+    table = metadata.tables.get(mapping.table_name)
 
     if table is None:
-        table = create_table(metadata, table_name, data_or_dataclass)
+        table = create_table(
+            metadata, mapping.table_name, data_or_dataclass, bind, unique_keys
+        )
 
     return table
 
 
-def create_table(metadata, table_name, data_or_dataclass):
+def create_table(metadata, table_name, data_or_dataclass, bind=None, unique_keys=False):
     # Add column for key fields of inputdata and all fields of outputdata.
+    mapping = get_mapping(data_or_dataclass)
     columns = [sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True)]
 
-    for field in dataclasses.fields(data_or_dataclass):
-        columns.append(_create_column(metadata, field))
+    for field in mapping.fields:
+        columns.append(_create_column(metadata, field, bind))
 
     # Create table.
     table = sqlalchemy.Table(table_name, metadata, *columns)
-    metadata.create_all(tables=[table])
+
+    # Add index over key fields, used to find rows
+    if mapping.keyfields:
+        sqlalchemy.Index(
+            f"ix_{table_name}_key",
+            *(table.c[column_name] for column_name in mapping.key_column_names),
+            unique=unique_keys,
+        )
+
+    # Add declared indexes
+    dialect = (bind if bind is not None else metadata.bind).dialect
+    for index in mapping.indexes:
+        _create_index(table, mapping, index, dialect)
+
+    metadata.create_all(bind=bind, tables=[table])
     logger.debug(f'Create table "{table_name}"')
 
     return table
 
 
-def _create_column(metadata, field):
+def _create_column(metadata, field, bind=None):
     if dataclasses.is_dataclass(field.type):
-        subtable = require_table(metadata, field.type)
+        subtable = require_table(metadata, field.type, bind)
         return sqlalchemy.Column(
             field.name + "_id", None, sqlalchemy.ForeignKey(subtable.name + ".id")
         )
@@ -92,6 +366,83 @@ def _create_column(metadata, field):
     return sqlalchemy.Column(field.name, column_type, nullable=nullable)
 
 
+def _create_index(table, mapping, index, dialect):
+    columns = [table.c[mapping.get_column_name(name)] for name in index.column_names]
+    include = [table.c[mapping.get_column_name(name)] for name in index.include]
+
+    kwargs = {}
+    if index.where is not None:
+        where = sqlalchemy.text(index.where)
+        kwargs["sqlite_where"] = where
+        kwargs["postgresql_where"] = where
+
+    if dialect.name == "postgresql":
+        kwargs["postgresql_include"] = [column.name for column in include]
+    elif not index.unique:
+        columns += include
+
+    return sqlalchemy.Index(
+        index.get_name(table.name), *columns, unique=index.unique, **kwargs
+    )
+
+
+def require_indexes(metadata, data_or_dataclass, bind=None):
+    """
+    Creates the index over the key fields and the declared indexes of the
+    dataclass, which don't already exist in the database, for instance for
+    tables created by older versions.
+    """
+    mapping = get_mapping(data_or_dataclass)
+    if mapping.keyfields:
+        require_key_index(metadata, data_or_dataclass, bind=bind)
+
+    table = require_table(metadata, data_or_dataclass, bind)
+    bind = bind if bind is not None else metadata.bind
+
+    index_names = set(index.name for index in table.indexes)
+    for index in mapping.indexes:
+        if index.get_name(table.name) in index_names:
+            continue
+
+        sqlindex = _create_index(table, mapping, index, bind.dialect)
+        sqlindex.create(bind)
+        logger.debug(f'Create index "{sqlindex.name}"')
+
+
+def require_key_index(metadata, data_or_dataclass, unique=False, bind=None):
+    """
+    Creates an index over the key fields of the dataclass, if it doesn't
+    already exist in the database, for instance for tables created by older
+    versions.
+    A non-unique index is replaced if *unique* is ``True``.
+    """
+    mapping = get_mapping(data_or_dataclass)
+    if not mapping.keyfields:
+        raise ValueError(f"Dataclass {mapping.dataclass.__name__} has no key fields")
+
+    table = require_table(metadata, data_or_dataclass, bind)
+    bind = bind if bind is not None else metadata.bind
+
+    index_name = f"ix_{table.name}_key"
+    for index in table.indexes:
+        if index.name != index_name:
+            continue
+
+        if index.unique or not unique:
+            return index
+
+        index.drop(bind)
+        table.indexes.remove(index)
+        break
+
+    columns = [table.c[column_name] for column_name in mapping.key_column_names]
+    index = sqlalchemy.Index(index_name, *columns, unique=unique)
+    index.create(bind)
+    logger.debug(f'Create index "{index_name}"')
+
+    return index
+
+
 def get_rowid(metadata, data):
     """
     Returns the row of the dataclass if it exists.
@@ -104,36 +455,255 @@ def get_rowid(metadata, data):
     if hasattr(data, "_rowid"):
         return data._rowid
 
-    # Find table
-    table_name = get_table_name(data)
-    table = metadata.tables.get(table_name)
-    if table is None:
-        return None
+    return get_rowids(metadata, [data])[0]
 
-    # Construct where statement
-    clauses = []
-    for field in keyfields(data):
-        value = getattr(data, field.name)
 
-        if dataclasses.is_dataclass(field.type):
-            rowid = get_rowid(metadata, value)
-            clause = table.c[field.name + "_id"] == rowid
-        else:
-            clause = table.c[field.name] == value
+def get_rowids(metadata, instances, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns the rows of many dataclass instances.
+    The instances are grouped by dataclass and each group is found with one
+    statement per chunk of *chunk_size* instances.
+    Args:
+        instances (iterable): dataclass instances
+    Returns:
+        list: row of each dataclass instance in its table, ``None`` if not found
+    """
+    instances = list(instances)
+
+    # Only look up the database when the identity map is not sufficient
+    if get_identity_map(metadata) is not None:
+        _get_rowids(None, metadata, instances, chunk_size)
+
+    if not all(hasattr(data, "_rowid") for data in instances if data is not None):
+        with metadata.bind.begin() as conn:
+            _get_rowids(conn, metadata, instances, chunk_size)
+
+    return [getattr(data, "_rowid", None) for data in instances]
+
+
+def _get_rowids(conn, metadata, instances, chunk_size):
+    # Group by dataclass
+    groups = {}
+    for data in instances:
+        if data is None or hasattr(data, "_rowid"):
+            continue
+        groups.setdefault(type(data), {})[id(data)] = data
+
+    for dataclass, datas in groups.items():
+        # Find table
+        mapping = get_mapping(dataclass)
+        table = mapping.get_table(metadata)
+        if table is None:
+            continue
+
+        # Find nested dataclasses of key fields
+        datas = list(datas.values())
+        for field in mapping.keyfields:
+            if field.name in mapping.nested_field_names:
+                values = [getattr(data, field.name) for data in datas]
+                _get_rowids(conn, metadata, values, chunk_size)
 
-        clauses.append(clause)
+        _find_rowids(conn, metadata, table, mapping, datas, chunk_size)
 
-    if not clauses:
-        raise ValueError(f"Dataclass {data.__class__.__name__} has no key fields")
+
+def _find_rowids(conn, metadata, table, mapping, datas, chunk_size):
+    """
+    Finds the rows of many instances of the same dataclass using one statement
+    per chunk of instances.
+    The nested dataclasses of the key fields must already have a ``_rowid``.
+    The ``_rowid`` of the instances found in the identity map or in the database
+    is set.
+    If *conn* is ``None``, only the identity map is looked up.
+    """
+    if not mapping.keyfields:
+        raise ValueError(f"Dataclass {mapping.dataclass.__name__} has no key fields")
+
+    columns = [table.c[column_name] for column_name in mapping.key_column_names]
+
+    # Group instances by key
+    identity_map = get_identity_map(metadata)
+    lookup = {}
+    for data in datas:
+        if hasattr(data, "_rowid"):
+            continue
+
+        values = _key_values(data, mapping)
+
+        if identity_map is not None:
+            rowid = identity_map.get(table.name, values)
+            if rowid is not None:
+                data._rowid = rowid
+                continue
+
+        lookup.setdefault(values, []).append(data)
+
+    if conn is None:
+        return
 
     # Execute
-    statement = sqlalchemy.sql.select([table.c.id]).where(sqlalchemy.sql.and_(*clauses))
-    logger.debug("Find statement: {}", str(statement.compile()).replace("\n", ""))
+    keys = list(lookup.keys())
+    for i in range(0, len(keys), chunk_size):
+        chunk = keys[i : i + chunk_size]
+
+        # NULL values cannot be matched with a tuple IN, use IS NULL instead
+        clauses = []
+        values_notnull = []
+        for values in chunk:
+            if None in values:
+                clauses.append(
+                    sqlalchemy.sql.and_(
+                        *(column == value for column, value in zip(columns, values))
+                    )
+                )
+            else:
+                values_notnull.append(values)
+
+        if values_notnull:
+            clauses.append(sqlalchemy.sql.tuple_(*columns).in_(values_notnull))
+
+        statement = sqlalchemy.sql.select([table.c.id, *columns]).where(
+            sqlalchemy.sql.or_(*clauses)
+        )
+        logger.opt(lazy=True).debug(
+            "Find statement: {}", lambda: str(statement.compile()).replace("\n", "")
+        )
+
+        for row in conn.execute(statement):
+            values = _normalize_key(row[1:])
+            for data in lookup.pop(values, []):
+                data._rowid = row[0]
+
+            if identity_map is not None:
+                identity_map.add(table.name, values, row[0])
+
+
+class _Journal:
+    """
+    Records the rowid and snapshot of instances before they are written in a
+    transaction, to restore them if the transaction is rolled back.
+    Tables created in the transaction are also removed from the metadata.
+    The cached results of the written tables are invalidated once the
+    transaction ends, as rows selected during it may be committed or not.
+    Used as a context manager, the instances are restored if an exception is
+    raised, and the results are invalidated in any case.
+    """
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self._states = {}
+        self._existing_table_names = set(metadata.tables)
+        self._written_table_names = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.revert()
+        else:
+            self.invalidate()
+
+    def record(self, datas):
+        for data in datas:
+            if data is None or id(data) in self._states:
+                continue
+
+            rowid = getattr(data, "_rowid", None)
+            snapshot = getattr(data, "_snapshot", None)
+            self._states[id(data)] = (data, rowid, snapshot)
+
+    def record_table(self, table):
+        self._written_table_names.add(table.name)
+
+    def invalidate(self):
+        """
+        Removes the cached results selected from the written tables, after
+        the transaction is committed or rolled back.
+        """
+        for table_name in self._written_table_names:
+            _invalidate_results(self.metadata, table_name)
+
+        self._written_table_names.clear()
+
+    def revert(self):
+        identity_map = get_identity_map(self.metadata)
+
+        for data, rowid, snapshot in self._states.values():
+            # The identity map may refer to rows that were rolled back
+            if identity_map is not None and hasattr(data, "_rowid"):
+                identity_map.discard(get_mapping(data).table_name, data._rowid)
+
+            _restore_attribute(data, "_rowid", rowid)
+            _restore_attribute(data, "_snapshot", snapshot)
+
+        self._states.clear()
+
+        # Tables are dropped by the rollback with dialects supporting
+        # transactional DDL, they are created again when next required
+        for table_name in set(self.metadata.tables) - self._existing_table_names:
+            self.metadata.remove(self.metadata.tables[table_name])
+
+        self.invalidate()
+
+
+def _restore_attribute(data, name, value):
+    if value is not None:
+        setattr(data, name, value)
+    elif hasattr(data, name):
+        delattr(data, name)
+
+
+def _remember_rowids(metadata, table, datas):
+    """
+    Adds the rowid of instances of the same dataclass to the identity map.
+    """
+    identity_map = get_identity_map(metadata)
+    if identity_map is None or not datas:
+        return
+
+    mapping = get_mapping(datas[0])
+    if not mapping.keyfields:
+        return
+
+    for data in datas:
+        identity_map.add(table.name, _key_values(data, mapping), data._rowid)
+
+
+def _forget_rowid(metadata, table, rowid):
+    """
+    Removes a rowid from the identity map.
+    """
+    identity_map = get_identity_map(metadata)
+    if identity_map is not None:
+        identity_map.discard(table.name, rowid)
+
+
+def _invalidate_results(metadata, table_name):
+    """
+    Removes the cached results selected from a table, after it was written.
+    """
+    result_cache = get_result_cache(metadata)
+    if result_cache is not None:
+        result_cache.invalidate(table_name)
+
+
+def _key_values(data, mapping):
+    """
+    Returns the values of the key fields of an instance, where nested dataclasses
+    are replaced by their rowid.
+    """
+    values = []
+    for field in mapping.keyfields:
+        value = getattr(data, field.name)
+
+        if field.name in mapping.nested_field_names:
+            value = getattr(value, "_rowid", None)
+
+        values.append(value)
+
+    return _normalize_key(values)
 
-    with metadata.bind.begin() as conn:
-        rowid = conn.execute(statement).scalar()
-        if not rowid:
-            return None
 
-        data._rowid = rowid
-        return rowid
+def _normalize_key(values):
+    # String key columns are created with a case-insensitive collation
+    return tuple(value.lower() if isinstance(value, str) else value for value in values)
@@ -0,0 +1,285 @@
+""""""
+
+# Standard library modules.
+import collections
+import sys
+import time
+
+# Third party modules.
+
+# Local modules.
+
+# Globals and constants variables.
+IDENTITY_MAP_KEY = "dataclasses_sql.identity_map"
+COMPILED_CACHE_KEY = "dataclasses_sql.compiled_cache"
+RESULT_CACHE_KEY = "dataclasses_sql.result_cache"
+
+
+class LRUCache:
+    """
+    Mapping of at most *maxsize* entries, where the least recently used entries
+    are evicted.
+    Counts the number of hits, misses and evictions.
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def clear(self):
+        self._data.clear()
+
+
+class IdentityMap:
+    """
+    Maps the key fields of dataclass instances to their rowid.
+    The least recently used entries are evicted when more than *maxsize*
+    entries are stored.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._rowids = collections.OrderedDict()
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._rowids)
+
+    def get(self, table_name, key):
+        rowid = self._rowids.get((table_name, key))
+        if rowid is None:
+            self.misses += 1
+            return None
+
+        self._rowids.move_to_end((table_name, key))
+        self.hits += 1
+        return rowid
+
+    def add(self, table_name, key, rowid):
+        oldrowid = self._rowids.pop((table_name, key), None)
+        if oldrowid is not None:
+            del self._keys[(table_name, oldrowid)]
+        self.discard(table_name, rowid)
+
+        self._rowids[(table_name, key)] = rowid
+        self._keys[(table_name, rowid)] = key
+
+        while len(self._rowids) > self.maxsize:
+            (table_name, key), rowid = self._rowids.popitem(last=False)
+            del self._keys[(table_name, rowid)]
+
+    def discard(self, table_name, rowid):
+        key = self._keys.pop((table_name, rowid), None)
+        if key is not None:
+            del self._rowids[(table_name, key)]
+
+    def clear(self):
+        self._rowids.clear()
+        self._keys.clear()
+
+
+class ResultCache:
+    """
+    Rows of select statements, keyed by statement and parameters.
+    The least recently used entries are evicted when more than *maxsize*
+    entries, or more than about *maxbytes* bytes, are stored.
+    Entries expire after *ttl* seconds, if not ``None``, and are invalidated
+    when one of the tables they were selected from is written.
+    """
+
+    def __init__(self, maxsize=1024, maxbytes=None, ttl=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.nbytes = 0
+
+        self._entries = collections.OrderedDict()
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        _table_names, rows, _nbytes, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            self._remove(key)
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return rows
+
+    def add(self, key, table_names, rows):
+        self._remove(key)
+
+        rows = tuple(rows)
+        nbytes = _estimate_nbytes(rows)
+        if self.maxbytes is not None and nbytes > self.maxbytes:
+            return
+
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (table_names, rows, nbytes, expires)
+        self.nbytes += nbytes
+        for table_name in table_names:
+            self._keys.setdefault(table_name, set()).add(key)
+
+        while len(self._entries) > self.maxsize or (
+            self.maxbytes is not None and self.nbytes > self.maxbytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, table_name):
+        """
+        Removes the entries selected from a table.
+        """
+        for key in list(self._keys.get(table_name, ())):
+            self._remove(key)
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._keys.clear()
+        self.nbytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        table_names, _rows, nbytes, _expires = entry
+        self.nbytes -= nbytes
+        for table_name in table_names:
+            keys = self._keys[table_name]
+            keys.discard(key)
+            if not keys:
+                del self._keys[table_name]
+
+
+def _estimate_nbytes(rows):
+    nbytes = sys.getsizeof(rows)
+    for row in rows:
+        nbytes += sys.getsizeof(row) + sum(map(sys.getsizeof, row))
+    return nbytes
+
+
+def enable_identity_map(metadata, maxsize=10000):
+    """
+    Enables an identity map for the database of the *metadata*, so that rowids
+    of instances with the same key fields are only looked up once.
+    Returns the identity map.
+    """
+    identity_map = metadata.info.get(IDENTITY_MAP_KEY)
+
+    if identity_map is None:
+        identity_map = IdentityMap(maxsize)
+        metadata.info[IDENTITY_MAP_KEY] = identity_map
+    else:
+        identity_map.maxsize = maxsize
+
+    return identity_map
+
+
+def disable_identity_map(metadata):
+    metadata.info.pop(IDENTITY_MAP_KEY, None)
+
+
+def get_identity_map(metadata):
+    """
+    Returns the identity map of the *metadata*, ``None`` if not enabled.
+    """
+    return metadata.info.get(IDENTITY_MAP_KEY)
+
+
+def get_compiled_cache(metadata, maxsize=512):
+    """
+    Returns the cache of the compiled insert, update and delete statements of
+    the database of the *metadata*.
+    Its hits count the statements executed without being compiled.
+    """
+    compiled_cache = metadata.info.get(COMPILED_CACHE_KEY)
+
+    if compiled_cache is None:
+        compiled_cache = LRUCache(maxsize)
+        metadata.info[COMPILED_CACHE_KEY] = compiled_cache
+
+    return compiled_cache
+
+
+def enable_result_cache(metadata, maxsize=1024, maxbytes=None, ttl=None):
+    """
+    Enables a cache of the rows returned by
+    :meth:`SelectStatementBuilder.fetchall` for the database of the *metadata*.
+    Cached rows are invalidated when a transaction writing their tables with
+    this package is committed or rolled back.
+    Returns the result cache.
+    """
+    result_cache = metadata.info.get(RESULT_CACHE_KEY)
+
+    if result_cache is None:
+        result_cache = ResultCache(maxsize, maxbytes, ttl)
+        metadata.info[RESULT_CACHE_KEY] = result_cache
+    else:
+        result_cache.maxsize = maxsize
+        result_cache.maxbytes = maxbytes
+        result_cache.ttl = ttl
+
+    return result_cache
+
+
+def disable_result_cache(metadata):
+    metadata.info.pop(RESULT_CACHE_KEY, None)
+
+
+def get_result_cache(metadata):
+    """
+    Returns the result cache of the *metadata*, ``None`` if not enabled.
+    """
+    return metadata.info.get(RESULT_CACHE_KEY)
@@ -0,0 +1,86 @@
+""""""
+
+# Standard library modules.
+import datetime
+
+# Third party modules.
+
+# Local modules.
+
+# Globals and constants variables.
+_NUMPY_DTYPES = {
+    int: "int64",
+    float: "float64",
+    bool: "bool",
+    datetime.datetime: "datetime64[us]",
+    datetime.date: "datetime64[D]",
+}
+
+
+class NumpyBackend:
+    """
+    Converts columns to :mod:`numpy` arrays.
+    Columns of integers or booleans with null values are converted to arrays
+    of objects, other columns without a corresponding dtype as well.
+    """
+
+    def __init__(self):
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        self.numpy = numpy
+
+    def convert(self, values, pytype):
+        dtype = _NUMPY_DTYPES.get(pytype, object)
+        if dtype in ("int64", "bool") and None in values:
+            dtype = object
+
+        return self.numpy.array(values, dtype=dtype)
+
+    def concatenate(self, names, pytypes, chunks):
+        columns = {}
+        for name, pytype, arrays in zip(names, pytypes, chunks):
+            if arrays:
+                columns[name] = self.numpy.concatenate(arrays)
+            else:
+                columns[name] = self.convert((), pytype)
+        return columns
+
+
+class ArrowBackend:
+    """
+    Converts columns to a :class:`pyarrow.Table`.
+    """
+
+    def __init__(self):
+        import pyarrow  # pylint: disable=import-outside-toplevel
+
+        self.pyarrow = pyarrow
+        self._types = {
+            int: pyarrow.int64(),
+            float: pyarrow.float64(),
+            bool: pyarrow.bool_(),
+            str: pyarrow.string(),
+            bytes: pyarrow.binary(),
+            datetime.datetime: pyarrow.timestamp("us"),
+            datetime.date: pyarrow.date32(),
+        }
+
+    def convert(self, values, pytype):
+        type_ = self._types.get(pytype)
+        try:
+            return self.pyarrow.array(values, type=type_)
+        except (self.pyarrow.ArrowInvalid, self.pyarrow.ArrowTypeError):
+            # For instance, dates returned as strings by the driver
+            return self.pyarrow.array(values).cast(type_)
+
+    def concatenate(self, names, pytypes, chunks):
+        columns = []
+        for pytype, arrays in zip(pytypes, chunks):
+            if not arrays:
+                arrays = [self.convert([], pytype)]
+            columns.append(self.pyarrow.chunked_array(arrays))
+
+        return self.pyarrow.table(columns, names=names)
+
+
+BACKENDS = {"numpy": NumpyBackend, "arrow": ArrowBackend}
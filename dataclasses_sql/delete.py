@@ -3,10 +3,22 @@
 # Standard library modules.
 
 # Third party modules.
+import sqlalchemy.sql
 from loguru import logger
 
 # Local modules.
-from .base import get_rowid, require_table
+from .base import (
+    DEFAULT_CHUNK_SIZE,
+    sort_dataclasses,
+    get_mapping,
+    get_statements,
+    _get_rowids,
+    _with_compiled_cache,
+    _forget_rowid,
+    _Journal,
+)
+from .cache import get_identity_map
+from .select import _create_builder
 
 # Globals and constants variables.
 
@@ -14,17 +26,112 @@ from .base import get_rowid, require_table
 def delete(metadata, data):
     """
     Remove a dataclass instance from database.
+    The rowid of the instance is removed, as it may be reused by another row.
     Returns ``True`` if successful.
     """
+    with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+        _delete_many(conn, metadata, [data], DEFAULT_CHUNK_SIZE, journal)
+
+    return True
+
+
+def delete_many(metadata, instances, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Remove many dataclass instances from database in a single transaction.
+    The rowids of the instances are found in bulk and the rows of each
+    dataclass are deleted with one statement per chunk of *chunk_size* rowids.
+    Returns the number of deleted rows.
+    """
+    with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+        return _delete_many(conn, metadata, instances, chunk_size, journal)
+
+
+def delete_where(metadata, dataclass, where):
+    """
+    Remove the rows of the dataclass matching the clauses, without loading
+    them.
+    The clauses are given as for :func:`select_objects` and can only refer to
+    columns of the dataclass.
+    A nested dataclass is referred by its rowid, e.g. ``(TreeData, "taxonomy", 1)``.
+    Returns the number of deleted rows.
+    """
+    mapping = get_mapping(dataclass)
+    table = mapping.get_table(metadata)
+    if table is None:
+        return 0
+
+    def get_sqlcolumn(dataclass_, column_name):
+        if dataclass_ != dataclass:
+            raise ValueError(f"Clause on dataclass {dataclass_.__name__} not allowed")
+
+        sqlcolumn = table.c.get(mapping.get_column_name(column_name))
+        if sqlcolumn is None:
+            raise ValueError(
+                f"Dataclass {dataclass.__name__} has no column {column_name}"
+            )
+        return sqlcolumn
+
+    builder = _create_builder(where)
+    params = builder._build_params()  # pylint: disable=protected-access
+
+    with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+        # Find the rowids to remove from the identity map
+        identity_map = get_identity_map(metadata)
+        if identity_map is not None:
+            statement = sqlalchemy.sql.select([table.c.id])
+            statement = builder._add_where(statement, get_sqlcolumn)
+            rowids = [row[0] for row in conn.execute(statement, params)]
+
+        statement = builder._add_where(table.delete(), get_sqlcolumn)
+        count = conn.execute(statement, params).rowcount
+        logger.debug(f"Deleted {count} rows from table {table.name}")
+        journal.record_table(table)
+
+        if identity_map is not None:
+            for rowid in rowids:
+                identity_map.discard(table.name, rowid)
+
+    return count
+
+
+def _delete_many(conn, metadata, iterable, chunk_size, journal):
+    conn = _with_compiled_cache(conn, metadata)
+
     # Find if data exists
-    rowid = get_rowid(metadata, data)
-    if rowid is None:
-        raise ValueError("Data does not exists")
+    datas = list(iterable)
+    journal.record(datas)
+    _get_rowids(conn, metadata, datas, chunk_size)
+
+    # Group by dataclass and rowid
+    groups = {}
+    for data in datas:
+        if not hasattr(data, "_rowid"):
+            raise ValueError("Data does not exists")
+        groups.setdefault(type(data), {}).setdefault(data._rowid, []).append(data)
+
+    # Delete dataclasses before their nested dataclasses
+    count = 0
+    for dataclass in reversed(sort_dataclasses(groups.keys())):
+        if dataclass not in groups:
+            continue
+
+        table = get_mapping(dataclass).get_table(metadata)
+        statement = get_statements(table).delete
+        rowids = sorted(groups[dataclass])
+
+        for i in range(0, len(rowids), chunk_size):
+            chunk = rowids[i : i + chunk_size]
+            result = conn.execute(statement, {"_rowids": chunk})
+            logger.debug(f"Deleted {result.rowcount} rows from table {table.name}")
+            journal.record_table(table)
+            count += result.rowcount
 
-    # Insert
-    table = require_table(metadata, data)
+            # The rowids may be reused by rows inserted later
+            for rowid in chunk:
+                _forget_rowid(metadata, table, rowid)
+                for data in groups[dataclass][rowid]:
+                    del data._rowid
+                    if hasattr(data, "_snapshot"):
+                        del data._snapshot
 
-    with metadata.bind.begin() as conn:
-        conn.execute(table.delete().where(table.c.id == rowid))
-        logger.debug(f"Deleted {data} to table {table.name}")
-        return True
+    return count
@@ -1,13 +1,26 @@
 """"""
 
 # Standard library modules.
-import dataclasses
+import collections
 
 # Third party modules.
 from loguru import logger
 
 # Local modules.
-from .base import require_table, get_rowid
+from .base import (
+    DEFAULT_CHUNK_SIZE,
+    sort_dataclasses,
+    require_table,
+    get_rowid,
+    get_rowids,
+    get_mapping,
+    get_statements,
+    _get_rowids,
+    _with_compiled_cache,
+    _key_values,
+    _Journal,
+    _remember_rowids,
+)
 
 # Globals and constants variables.
 
@@ -21,35 +34,164 @@ def insert(metadata, data, check_exists=True):
     if hasattr(data, "_rowid"):
         return False
 
+    with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+        count = _insert_many(
+            conn, metadata, [data], check_exists, DEFAULT_CHUNK_SIZE, journal
+        )
+
+    return count == 1
+
+
+def insert_many(metadata, iterable, check_exists=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Insert many dataclass instances into database in a single transaction.
+    Instances and their nested instances are grouped by dataclass and each
+    group is inserted with one statement per chunk of *chunk_size* instances,
+    the groups of nested dataclasses first.
+    Nested instances with the same key fields share a row. If *check_exists*
+    is ``True``, the given instances are also deduplicated and existing rows
+    are looked up.
+    Raises :class:`ValueError` if the nested dataclasses form a cycle.
+    Returns the number of inserted instances.
+    If the transaction fails, the instances are left as before the call.
+    """
+    with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+        return _insert_many(conn, metadata, iterable, check_exists, chunk_size, journal)
+
+
+def _insert_many(conn, metadata, iterable, check_exists, chunk_size, journal):
+    datas = [data for data in iterable if data is not None]
+    journal.record(datas)
+
+    # Check if exists, before walking the nested dataclasses of existing ones.
+    # Instances without key fields cannot be found and are always inserted.
     if check_exists:
-        rowid = get_rowid(metadata, data)
-        if rowid is not None:
-            return False
-
-    # Create row
-    row = {}
-    for field in dataclasses.fields(data):
-        name = field.name
-        value = getattr(data, name)
-
-        if dataclasses.is_dataclass(value):
-            insert(metadata, value, check_exists)
-            row[name + "_id"] = int(value._rowid)
-        else:
-            row[name] = value
-
-    # Insert
-    table = require_table(metadata, data)
-
-    with metadata.bind.begin() as conn:
-        result = conn.execute(
-            table.insert(), row
+        keyed = [data for data in datas if get_mapping(data).keyfields]
+        _get_rowids(conn, metadata, keyed, chunk_size)
+    given = set(map(id, datas))
+    checked = given if check_exists else set()
+
+    # Group the instances and their nested instances by dataclass
+    groups = _group_graph(datas)
+
+    # Insert the tables of nested dataclasses first, one group at a time
+    count = 0
+    for dataclass in sort_dataclasses(groups.keys()):
+        if dataclass not in groups:
+            continue
+
+        datas = list(groups[dataclass].values())
+        journal.record(datas)
+        mapping = get_mapping(dataclass)
+        lookup = check_exists and bool(mapping.keyfields)
+        if lookup:
+            _get_rowids(
+                conn,
+                metadata,
+                [data for data in datas if id(data) not in checked],
+                chunk_size,
+            )
+        datas = [data for data in datas if not hasattr(data, "_rowid")]
+        if not datas:
+            continue
+
+        table = require_table(metadata, dataclass, bind=conn)
+
+        # Remove duplicates, they share the rowid of the first instance.
+        # Without check, the given instances are all inserted, but the nested
+        # ones are still deduplicated, which costs no query.
+        duplicates = []
+        if mapping.keyfields:
+            firsts = {}
+            unique = []
+            for data in datas:
+                values = _key_values(data, mapping)
+                first = firsts.setdefault(values, data)
+                if first is not data and (check_exists or id(data) not in given):
+                    duplicates.append((data, first))
+                else:
+                    unique.append(data)
+            datas = unique
+
+        # Insert
+        for i in range(0, len(datas), chunk_size):
+            chunk = datas[i : i + chunk_size]
+
+            rows = [mapping.to_row(data) for data in chunk]
+            rowids = _insert_rows(conn, metadata, table, rows)
+            for data, row, rowid in zip(chunk, rows, rowids):
+                data._rowid = rowid
+                data._snapshot = row
+            _remember_rowids(metadata, table, chunk)
+
+            logger.debug(f"Added {len(chunk)} rows to table {table.name}")
+            journal.record_table(table)
+            count += sum(id(data) in given for data in chunk)
+
+        for data, first in duplicates:
+            data._rowid = first._rowid
+            data._snapshot = dict(first._snapshot)
+
+    return count
+
+
+def _group_graph(datas):
+    """
+    Groups instances without rowid, and their nested instances without rowid,
+    by dataclass.
+    """
+    groups = {}
+    queue = collections.deque(datas)
+    while queue:
+        data = queue.popleft()
+        if data is None or hasattr(data, "_rowid"):
+            continue
+
+        group = groups.setdefault(type(data), {})
+        if id(data) in group:
+            continue
+        group[id(data)] = data
+
+        for field in get_mapping(data).nested_fields:
+            queue.append(getattr(data, field.name))
+
+    return groups
+
+
+def _insert_rows(conn, metadata, table, rows):
+    """
+    Inserts rows in a table and returns their rowids.
+    """
+    conn = _with_compiled_cache(conn, metadata)
+    statements = get_statements(table)
+
+    if len(rows) == 1:
+        result = conn.execute(statements.insert, rows[0])
+        return [result.inserted_primary_key[0]]
+
+    # Rowids are not returned by an executemany. With SQLite, rows inserted by
+    # the same statement get consecutive rowids, while the transaction locks
+    # the database.
+    if conn.dialect.name == "sqlite":
+        conn.execute(statements.insert, rows)
+        lastrowid = conn.execute(statements.max_rowid).scalar()
+        return list(range(lastrowid - len(rows) + 1, lastrowid + 1))
+
+    if getattr(conn.dialect, "full_returning", False):
+        statement = (
+            table.insert().values(rows).returning(table.c.id)
         )  # pylint: disable=no-value-for-parameter
-        logger.debug(f"Added {data} to table {table.name}")
-        rowid = result.inserted_primary_key[0]
-        data._rowid = rowid
-        return True
+        return [row[0] for row in conn.execute(statement)]
+
+    return [_insert_rows(conn, metadata, table, [row])[0] for row in rows]
 
 
 def exists(metadata, data):
     return get_rowid(metadata, data) is not None
+
+
+def exists_many(metadata, instances):
+    """
+    Returns whether each dataclass instance exists in the database.
+    """
+    return [rowid is not None for rowid in get_rowids(metadata, instances)]
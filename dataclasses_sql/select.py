@@ -9,7 +9,9 @@ import typing
 import sqlalchemy.sql
 
 # Local modules.
-from .base import get_table_name
+from .base import DEFAULT_CHUNK_SIZE, get_mapping
+from .cache import LRUCache, get_result_cache
+from .columnar import BACKENDS
 
 # Globals and constants variables.
 _OPERATION_LOOKUP = {
@@ -25,9 +27,17 @@ _OPERATION_LOOKUP = {
     "isnot": lambda column, value: column.isnot(value),
 }
 
+_AGGREGATE_LOOKUP = {
+    "count": sqlalchemy.sql.func.count,
+    "sum": sqlalchemy.sql.func.sum,
+    "avg": sqlalchemy.sql.func.avg,
+    "min": sqlalchemy.sql.func.min,
+    "max": sqlalchemy.sql.func.max,
+}
+
 
 def _check_column_exists(dataclass, column_name):
-    field_names = set(field.name for field in dataclasses.fields(dataclass))
+    field_names = get_mapping(dataclass).field_names
     if not column_name.endswith("id") and column_name not in field_names:
         raise ValueError(f"Dataclass {dataclass.__name__} has no column {column_name}")
 
@@ -38,16 +48,79 @@ class _Clause:
     column_name: str
     value: typing.Any
     operation: typing.Any
+    func: str = None
+
+
+def _isbound(clause):
+    # NULL and IS comparisons are rendered with the value
+    return clause.operation not in ("is", "isnot") and clause.value is not None
+
+
+def _clause_key(clause):
+    if not _isbound(clause):
+        return (
+            clause.dataclass,
+            clause.column_name,
+            clause.operation,
+            clause.func,
+            clause.value,
+        )
+
+    if clause.operation in ("in", "notin"):
+        values = list(clause.value)
+        value_type = type(values[0]) if values else None
+    else:
+        value_type = type(clause.value)
+
+    return (
+        clause.dataclass,
+        clause.column_name,
+        clause.operation,
+        clause.func,
+        value_type,
+    )
+
+
+def _check_aggregate_exists(func):
+    if func not in _AGGREGATE_LOOKUP:
+        valid_funcs_str = ", ".join(_AGGREGATE_LOOKUP.keys())
+        raise ValueError(
+            f"Unknown aggregate function: {func}, valid functions: {valid_funcs_str}"
+        )
+
+
+def _create_bindparam(name, clause):
+    if clause.operation in ("in", "notin"):
+        values = list(clause.value)
+        type_ = sqlalchemy.sql.literal(values[0]).type if values else None
+        return sqlalchemy.sql.bindparam(name, values, type_=type_, expanding=True)
+
+    return sqlalchemy.sql.bindparam(name, clause.value)
+
+
+def _freeze_params(params):
+    return tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in sorted(params.items())
+    )
 
 
 class SelectStatementBuilder:
-    def __init__(self, distinct=False):
+    #: Statements shared by builders with the same shape, see :meth:`cache_key`
+    statement_cache = LRUCache(maxsize=512)
+
+    def __init__(self, distinct=False, limit=None):
         self.distinct = distinct
+        self.limit = limit
 
         self._tables = set()
         self._columns = []
         self._joins = {}
         self._clauses = []
+        self._group_by = []
+        self._having = []
+        self._order_by = []
+        self._keyset = ()
 
     def add_column(self, dataclass, column_name, label=None):
         # Check column exist
@@ -55,21 +128,53 @@ class SelectStatementBuilder:
 
         # Add column
         self._tables.add(dataclass)
-        self._columns.append((dataclass, column_name, label))
+        self._columns.append((dataclass, column_name, label, None))
 
     def add_all_columns(self, dataclass):
         # Add table
         self._tables.add(dataclass)
 
-        # Add id column
-        self._columns.append((dataclass, "id", None))
+        # Add column for id and each field
+        for column_name in get_mapping(dataclass).column_names:
+            self._columns.append((dataclass, column_name, None, None))
 
-        # Add column for each field
-        for field in dataclasses.fields(dataclass):
-            if dataclasses.is_dataclass(field.type):
-                self._columns.append((dataclass, f"{field.name}_id", None))
-            else:
-                self._columns.append((dataclass, field.name, None))
+    def add_aggregate(self, dataclass, column_name, func="count", label=None):
+        """
+        Adds a column aggregating the values of a column with the function
+        *func*: ``"count"``, ``"sum"``, ``"avg"``, ``"min"`` or ``"max"``.
+        The column is labelled ``<func>_<column_name>`` by default.
+        """
+        # Checks
+        _check_column_exists(dataclass, column_name)
+        _check_aggregate_exists(func)
+
+        if label is None:
+            label = f"{func}_{column_name}"
+
+        # Add column
+        self._tables.add(dataclass)
+        self._columns.append((dataclass, column_name, label, func))
+
+    def add_group_by(self, dataclass, column_name):
+        # Check column exist
+        _check_column_exists(dataclass, column_name)
+
+        # Add group by
+        self._tables.add(dataclass)
+        self._group_by.append((dataclass, column_name))
+
+    def add_having(self, dataclass, column_name, func, value, operation="=="):
+        """
+        Adds a clause on a column aggregated with the function *func*, which
+        groups must satisfy, e.g. ``(TreeData, "id", "count", 10, ">=")``.
+        """
+        _check_aggregate_exists(func)
+
+        clause = self.create_clause(dataclass, column_name, value, operation)
+        clause.func = func
+
+        self._tables.add(dataclass)
+        self._having.append(clause)
 
     def add_join(
         self,
@@ -87,7 +192,7 @@ class SelectStatementBuilder:
 
         # Find corresponding field in the left dataclass
         if column_name_left is None:
-            for field in dataclasses.fields(dataclass_left):
+            for field in get_mapping(dataclass_left).nested_fields:
                 if field.type == dataclass_right:
                     column_name_left = f"{field.name}_id"
                     break
@@ -122,6 +227,14 @@ class SelectStatementBuilder:
             self._tables.add(clause.dataclass)
         self._clauses.append(tuple(clauses))
 
+    def add_order_by(self, dataclass, column_name, descending=False):
+        # Check column exist
+        _check_column_exists(dataclass, column_name)
+
+        # Add order
+        self._tables.add(dataclass)
+        self._order_by.append((dataclass, column_name, descending))
+
     def create_clause(self, dataclass, column_name, value, operation="=="):
         # Check column exist
         _check_column_exists(dataclass, column_name)
@@ -135,23 +248,80 @@ class SelectStatementBuilder:
 
         return _Clause(dataclass, column_name, value, operation)
 
-    def build(self):
+    def cache_key(self):
+        """
+        Returns a key identifying the shape of the statement: its tables,
+        columns, joins and clause operations, but not the values of the clauses.
+        """
+        return (
+            self.distinct,
+            frozenset(self._tables),
+            tuple(self._columns),
+            tuple(self._joins.items()),
+            tuple(tuple(map(_clause_key, clauses_or)) for clauses_or in self._clauses),
+            tuple(self._group_by),
+            tuple(map(_clause_key, self._having)),
+            tuple(self._order_by),
+            self.limit is not None,
+            tuple(
+                (dataclass, column_name, type(value))
+                for dataclass, column_name, value in self._keyset
+            ),
+        )
+
+    def build(self, metadata=None):
+        statement, params = self.prepare(metadata)
+        if params:
+            statement = statement.params(params)
+        return statement
+
+    def prepare(self, metadata=None):
+        """
+        Returns the statement, where the values of the clauses are bound
+        parameters, and the values of these parameters.
+        Columns are those of the typed tables of the *metadata*, or, for tables
+        unknown by the metadata, typed from the fields of the dataclasses.
+        Statements are cached by the shape of the builder (see :meth:`cache_key`)
+        and their tables, so that builders with the same shape reuse the same
+        statement, and its compiled form.
+
+        Example::
+
+            statement, params = builder.prepare(metadata)
+            rows = conn.execute(statement, params).fetchall()
+        """
         # Checks
         if not self._tables:
             raise ValueError("No table in select")
 
-        # Create table lookup
         sqltables = {}
         for dataclass in self._tables:
-            table_name = get_table_name(dataclass)
-            sqltable = sqlalchemy.sql.table(table_name)
-            sqltables[dataclass] = sqltable
+            mapping = get_mapping(dataclass)
+            table = mapping.get_table(metadata) if metadata is not None else None
+            sqltables[dataclass] = mapping.table_clause if table is None else table
+
+        key = (self.cache_key(), frozenset(sqltables.items()))
+        statement = self.statement_cache.get(key)
+        if statement is None:
+            statement = self._build_statement(sqltables)
+            self.statement_cache[key] = statement
+
+        return statement, self._build_params()
+
+    def _build_statement(self, sqltables):
+        def get_sqlcolumn(dataclass, column_name):
+            sqltable = sqltables[dataclass]
+            if column_name in sqltable.c:
+                return sqltable.c[column_name]
+            return sqlalchemy.sql.column(column_name, _selectable=sqltable)
 
         # Create columns
         sqlcolumns = []
-        for dataclass, column_name, label in self._columns:
-            sqltable = sqltables[dataclass]
-            sqlcolumn = sqlalchemy.sql.column(column_name, _selectable=sqltable)
+        for dataclass, column_name, label, func in self._columns:
+            sqlcolumn = get_sqlcolumn(dataclass, column_name)
+
+            if func is not None:
+                sqlcolumn = _AGGREGATE_LOOKUP[func](sqlcolumn)
 
             if label is not None:
                 sqlcolumn = sqlcolumn.label(label)
@@ -173,12 +343,8 @@ class SelectStatementBuilder:
                 sqltable_left = sqltables[dataclass_left]
                 sqltable_right = sqltables[dataclass_right]
 
-                sqlcolumn_left = sqlalchemy.sql.column(
-                    column_name_left, _selectable=sqltable_left
-                )
-                sqlcolumn_right = sqlalchemy.sql.column(
-                    column_name_right, _selectable=sqltable_right
-                )
+                sqlcolumn_left = get_sqlcolumn(dataclass_left, column_name_left)
+                sqlcolumn_right = get_sqlcolumn(dataclass_right, column_name_right)
 
                 onclause = sqlcolumn_left == sqlcolumn_right
                 sqljoins.append((sqltable_left, sqltable_right, onclause, outer))
@@ -206,17 +372,477 @@ class SelectStatementBuilder:
             statement = statement.select_from(finaljoin)
 
         # Create clauses
+        statement = self._add_where(statement, get_sqlcolumn)
+        statement = self._add_group_by(statement, get_sqlcolumn)
+        return self._add_order_by(statement, get_sqlcolumn)
+
+    def _add_where(self, statement, get_sqlcolumn):
         sqlclauses = []
-        for clauses_or in self._clauses:
+        for i, clauses_or in enumerate(self._clauses):
             sqlclauses_or = []
-            for clause in clauses_or:
-                sqltable = sqltables[clause.dataclass]
-                sqlcolumn = sqlalchemy.sql.column(
-                    clause.column_name, _selectable=sqltable
-                )
-                sqlclause = _OPERATION_LOOKUP[clause.operation](sqlcolumn, clause.value)
+            for j, clause in enumerate(clauses_or):
+                sqlcolumn = get_sqlcolumn(clause.dataclass, clause.column_name)
+
+                value = clause.value
+                if _isbound(clause):
+                    value = _create_bindparam(f"value_{i}_{j}", clause)
+
+                sqlclause = _OPERATION_LOOKUP[clause.operation](sqlcolumn, value)
                 sqlclauses_or.append(sqlclause)
 
             sqlclauses.append(sqlalchemy.sql.or_(*sqlclauses_or))
 
+        # Rows after the key of the last row of the previous page
+        if self._keyset:
+            sqlcolumns = []
+            sqlvalues = []
+            for i, (dataclass, column_name, value) in enumerate(self._keyset):
+                sqlcolumns.append(get_sqlcolumn(dataclass, column_name))
+                sqlvalues.append(sqlalchemy.sql.bindparam(f"keyset_{i}", value))
+
+            sqlclauses.append(
+                sqlalchemy.sql.tuple_(*sqlcolumns) > sqlalchemy.sql.tuple_(*sqlvalues)
+            )
+
+        if not sqlclauses:
+            return statement
+
         return statement.where(sqlalchemy.sql.and_(*sqlclauses))
+
+    def _add_group_by(self, statement, get_sqlcolumn):
+        for dataclass, column_name in self._group_by:
+            statement = statement.group_by(get_sqlcolumn(dataclass, column_name))
+
+        for i, clause in enumerate(self._having):
+            sqlcolumn = get_sqlcolumn(clause.dataclass, clause.column_name)
+            sqlcolumn = _AGGREGATE_LOOKUP[clause.func](sqlcolumn)
+
+            value = clause.value
+            if _isbound(clause):
+                value = _create_bindparam(f"having_{i}", clause)
+
+            statement = statement.having(
+                _OPERATION_LOOKUP[clause.operation](sqlcolumn, value)
+            )
+
+        return statement
+
+    def _add_order_by(self, statement, get_sqlcolumn):
+        for dataclass, column_name, descending in self._order_by:
+            sqlcolumn = get_sqlcolumn(dataclass, column_name)
+            statement = statement.order_by(
+                sqlcolumn.desc() if descending else sqlcolumn
+            )
+
+        if self.limit is not None:
+            statement = statement.limit(
+                sqlalchemy.sql.bindparam("limit", type_=sqlalchemy.Integer)
+            )
+
+        return statement
+
+    def _build_params(self):
+        params = {}
+        for i, clauses_or in enumerate(self._clauses):
+            for j, clause in enumerate(clauses_or):
+                if not _isbound(clause):
+                    continue
+
+                value = clause.value
+                if clause.operation in ("in", "notin"):
+                    value = list(value)
+
+                params[f"value_{i}_{j}"] = value
+
+        for i, clause in enumerate(self._having):
+            if _isbound(clause):
+                value = clause.value
+                if clause.operation in ("in", "notin"):
+                    value = list(value)
+                params[f"having_{i}"] = value
+
+        for i, (_dataclass, _column_name, value) in enumerate(self._keyset):
+            params[f"keyset_{i}"] = value
+
+        if self.limit is not None:
+            params["limit"] = self.limit
+
+        return params
+
+    def fetchall(self, metadata):
+        """
+        Returns the rows of the statement created by :meth:`build`.
+        If the result cache of the *metadata* is enabled (see
+        :func:`enable_result_cache`), rows are cached by statement and values
+        of the clauses, until a write to one of the tables of the builder ends.
+        """
+        statement, params = self.prepare(metadata)
+        return self._fetchall(metadata, None, statement, params)
+
+    def count(self, metadata):
+        """
+        Returns the number of rows of the statement created by :meth:`build`,
+        without selecting its columns.
+        """
+        statement, params = self._prepare_derived(metadata, "count", self._build_count)
+        return self._fetchall(metadata, "count", statement, params)[0][0]
+
+    def exists(self, metadata):
+        """
+        Returns whether the statement created by :meth:`build` returns at
+        least one row, stopping at the first one.
+        """
+        statement, params = self._prepare_derived(
+            metadata, "exists", self._build_exists
+        )
+        return bool(self._fetchall(metadata, "exists", statement, params)[0][0])
+
+    def _prepare_derived(self, metadata, kind, build):
+        """
+        Returns a statement derived from the statement of the builder, cached
+        as the latter, and the values of its parameters.
+        """
+        statement, params = self.prepare(metadata)
+
+        key = (kind, statement)
+        derived = self.statement_cache.get(key)
+        if derived is None:
+            derived = self.statement_cache[key] = build(statement)
+
+        return derived, params
+
+    def _build_count(self, statement):
+        count = sqlalchemy.sql.func.count()
+
+        # Rows of grouped, aggregated, distinct or limited statements must be
+        # counted from a subquery
+        if (
+            self.distinct
+            or self._group_by
+            or self._having
+            or self._is_aggregated()
+            or self.limit is not None
+        ):
+            return sqlalchemy.sql.select([count]).select_from(statement.subquery())
+
+        return statement.with_only_columns(
+            [count], maintain_column_froms=True
+        ).order_by(None)
+
+    def _build_exists(self, statement):
+        # Aggregated statements return a row even without rows to aggregate,
+        # other statements select a constant column, also when none is selected
+        if not self._is_aggregated():
+            statement = statement.with_only_columns(
+                [sqlalchemy.sql.literal_column("1")], maintain_column_froms=True
+            ).order_by(None)
+
+        if self.limit is None:
+            statement = statement.limit(1)
+        return sqlalchemy.sql.select([statement.exists()])
+
+    def _is_aggregated(self):
+        return any(func is not None for *_other, func in self._columns)
+
+    def _fetchall(self, metadata, kind, statement, params):
+        result_cache = get_result_cache(metadata)
+        if result_cache is not None:
+            key = (kind, self.cache_key(), _freeze_params(params))
+            rows = result_cache.get(key)
+            if rows is not None:
+                return list(rows)
+
+        with metadata.bind.begin() as conn:
+            rows = conn.execute(statement, params).fetchall()
+
+        if result_cache is not None:
+            table_names = frozenset(
+                get_mapping(dataclass).table_name for dataclass in self._tables
+            )
+            result_cache.add(key, table_names, rows)
+
+        return rows
+
+    def pages(self, metadata, key=("id",), page_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yields the rows of the statement created by :meth:`build` by pages of
+        at most *page_size* rows, using keyset pagination.
+        Rows are ordered by the *key* columns, which must be selected and
+        unique together. Each page selects the rows after the key of the last
+        row of the previous page, so that deep pages cost the same as the first
+        one when the key columns are indexed.
+        Key columns are given as column names of the only dataclass of the
+        builder, or as ``(dataclass, column_name)``.
+        As pages are limited and ordered by the key columns, the builder must
+        have neither a limit nor an order by.
+
+        Example::
+
+            for rows in builder.pages(metadata, key=("id",), page_size=1000):
+                ...
+        """
+        if self.limit is not None:
+            raise ValueError("Cannot paginate a statement with a limit")
+        if self._order_by:
+            raise ValueError("Cannot paginate a statement with an order by")
+
+        keys = []
+        for column in key:
+            if isinstance(column, str):
+                if len(self._tables) != 1:
+                    raise ValueError(f"Dataclass of key column {column} is ambiguous")
+                column = (next(iter(self._tables)), column)
+            keys.append(tuple(column))
+
+        # Find the key columns in the rows
+        selected = [
+            (dataclass, column_name, func)
+            for dataclass, column_name, _, func in self._columns
+        ]
+        indexes = []
+        for dataclass, column_name in keys:
+            if (dataclass, column_name, None) not in selected:
+                raise ValueError(
+                    f"Key column {column_name} of dataclass {dataclass.__name__} is not selected"
+                )
+            indexes.append(selected.index((dataclass, column_name, None)))
+
+        builder = SelectStatementBuilder(self.distinct, page_size)
+        builder._tables = set(self._tables)
+        builder._columns = list(self._columns)
+        builder._joins = dict(self._joins)
+        builder._clauses = list(self._clauses)
+        builder._group_by = list(self._group_by)
+        builder._having = list(self._having)
+        builder._order_by = [
+            (dataclass, column_name, False) for dataclass, column_name in keys
+        ]
+
+        while True:
+            rows = builder.fetchall(metadata)
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+
+            builder._keyset = tuple(
+                (dataclass, column_name, rows[-1][index])
+                for (dataclass, column_name), index in zip(keys, indexes)
+            )
+
+    def fetch_objects(self, metadata, dataclass):
+        """
+        Returns the instances of the dataclass matching the clauses of the
+        builder.
+        Nested dataclasses are loaded in the same query, by joining their
+        tables, and instances shared by many rows are only created once.
+        Clauses can refer to the dataclass or its nested dataclasses.
+        The columns and joins of the builder are not used.
+        """
+        if get_mapping(dataclass).get_table(metadata) is None:
+            return []
+
+        loader = _ObjectLoader(metadata, dataclass)
+        statement = self._add_where(loader.statement, loader.get_sqlcolumn)
+        statement = self._add_order_by(statement, loader.get_sqlcolumn)
+
+        with metadata.bind.begin() as conn:
+            return loader.load(conn.execute(statement, self._build_params()))
+
+    def stream(self, metadata, chunk_size=DEFAULT_CHUNK_SIZE, dataclass=None):
+        """
+        Yields the rows of the statement created by :meth:`build`, or if
+        *dataclass* is given, the instances of the dataclass as returned by
+        :meth:`fetch_objects`.
+        Rows are fetched *chunk_size* at a time, using server-side cursors
+        if the dialect supports them, so that memory stays bounded regardless
+        of the number of rows.
+        """
+        if dataclass is not None and get_mapping(dataclass).get_table(metadata) is None:
+            return
+
+        statement, params, load = self._prepare_stream(metadata, dataclass)
+
+        with metadata.bind.begin() as conn:
+            result = conn.execution_options(stream_results=True).execute(
+                statement, params
+            )
+
+            while True:
+                rows = result.fetchmany(chunk_size)
+                if not rows:
+                    break
+
+                yield from load(rows)
+
+    def _prepare_stream(self, metadata, dataclass):
+        """
+        Returns the statement, its parameters and the function loading the rows
+        of a chunk for :meth:`stream`.
+        """
+        if dataclass is None:
+            statement, params = self.prepare(metadata)
+            return statement, params, list
+
+        loader = _ObjectLoader(metadata, dataclass)
+        statement = self._add_where(loader.statement, loader.get_sqlcolumn)
+        statement = self._add_order_by(statement, loader.get_sqlcolumn)
+        return statement, self._build_params(), loader.load
+
+    def fetch_columns(self, metadata, backend="numpy", chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Returns the selected columns as typed arrays, with the ``"numpy"``
+        backend a :class:`dict` of :class:`numpy.ndarray` and with the
+        ``"arrow"`` backend a :class:`pyarrow.Table`, both keyed by column
+        labels or names.
+        The array types are chosen from the types of the dataclass fields.
+        Rows are converted *chunk_size* at a time.
+        """
+        if backend not in BACKENDS:
+            valid_backends_str = ", ".join(BACKENDS.keys())
+            raise ValueError(
+                f"Unknown backend: {backend}, valid backends: {valid_backends_str}"
+            )
+
+        names = []
+        pytypes = []
+        for dataclass, column_name, label, func in self._columns:
+            name = column_name if label is None else label
+            if name in names:
+                raise ValueError(f"Duplicate column {name}, use a label")
+            names.append(name)
+            pytypes.append(_get_column_type(dataclass, column_name, func))
+
+        backend = BACKENDS[backend]()
+        chunks = [[] for _ in names]
+
+        with metadata.bind.begin() as conn:
+            statement, params = self.prepare(metadata)
+            result = conn.execution_options(stream_results=True).execute(
+                statement, params
+            )
+
+            while True:
+                rows = result.fetchmany(chunk_size)
+                if not rows:
+                    break
+
+                for values, pytype, arrays in zip(zip(*rows), pytypes, chunks):
+                    arrays.append(backend.convert(values, pytype))
+
+        return backend.concatenate(names, pytypes, chunks)
+
+
+def _get_column_type(dataclass, column_name, func=None):
+    if func == "count":
+        return int
+    if func == "avg":
+        return float
+
+    for field in get_mapping(dataclass).fields:
+        if field.name == column_name:
+            return field.type
+
+    # Id and foreign key columns
+    return int
+
+
+class _ObjectLoader:
+    """
+    Creates a statement selecting the columns of a dataclass and of its nested
+    dataclasses, and loads the instances from the rows.
+    """
+
+    def __init__(self, metadata, dataclass):
+        self._nodes = []
+        self._sqltables = {}
+
+        sqlcolumns = []
+        self._sqljoin = None
+        self._add_node(metadata, dataclass, sqlcolumns, None, None)
+
+        self.statement = sqlalchemy.sql.select(sqlcolumns).select_from(self._sqljoin)
+
+    def _add_node(self, metadata, dataclass, sqlcolumns, parent_sqltable, field):
+        index = len(self._nodes)
+        mapping = get_mapping(dataclass)
+        table = mapping.get_table(metadata)
+
+        if parent_sqltable is None:
+            sqltable = table
+            self._sqljoin = sqltable
+        else:
+            sqltable = table.alias(f"{table.name}_{index}")
+            onclause = sqltable.c.id == parent_sqltable.c[field.name + "_id"]
+            self._sqljoin = self._sqljoin.outerjoin(sqltable, onclause)
+
+        self._sqltables.setdefault(dataclass, sqltable)
+
+        start = len(sqlcolumns)
+        sqlcolumns.extend(sqltable.c[name] for name in mapping.column_names)
+        children = []
+        self._nodes.append((mapping, start, len(sqlcolumns), children))
+
+        for field in mapping.nested_fields:
+            children.append(len(self._nodes))
+            self._add_node(metadata, field.type, sqlcolumns, sqltable, field)
+
+    def get_sqlcolumn(self, dataclass, column_name):
+        if dataclass not in self._sqltables:
+            raise ValueError(f"Dataclass {dataclass.__name__} is not loaded")
+
+        sqltable = self._sqltables[dataclass]
+        sqlcolumn = sqltable.c.get(get_mapping(dataclass).get_column_name(column_name))
+        if sqlcolumn is None:
+            raise ValueError(
+                f"Dataclass {dataclass.__name__} has no column {column_name}"
+            )
+        return sqlcolumn
+
+    def load(self, rows):
+        instances = {}
+        datas = []
+        for row in rows:
+            data = self._load_node(row, 0, instances)
+            if data is not None:
+                datas.append(data)
+        return datas
+
+    def _load_node(self, row, index, instances):
+        mapping, start, stop, children = self._nodes[index]
+        values = row[start:stop]
+        if values[0] is None:
+            return None
+
+        key = (mapping.dataclass, values[0])
+        data = instances.get(key)
+        if data is None:
+            nested = tuple(self._load_node(row, child, instances) for child in children)
+            data = instances[key] = mapping.from_row(values, nested)
+
+        return data
+
+
+def select_objects(metadata, dataclass, where=()):
+    """
+    Returns the instances of the dataclass, with their nested dataclasses,
+    matching the clauses.
+    Each clause is either the arguments of
+    :meth:`SelectStatementBuilder.add_clause`, e.g.
+    ``(TreeData, "diameter_m", 3.0, ">=")``, or a clause created by
+    :meth:`SelectStatementBuilder.create_clause`.
+    A nested dataclass is referred by its rowid, e.g. ``(TreeData, "taxonomy", 1)``.
+    """
+    return _create_builder(where).fetch_objects(metadata, dataclass)
+
+
+def _create_builder(where):
+    builder = SelectStatementBuilder()
+
+    for clause in where:
+        if isinstance(clause, _Clause):
+            builder.add_clause(clause)
+        else:
+            builder.add_clause(*clause)
+
+    return builder
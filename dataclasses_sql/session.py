@@ -0,0 +1,150 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+
+# Local modules.
+from .base import DEFAULT_CHUNK_SIZE, _Journal
+from .cache import get_identity_map
+from .insert import _insert_many
+from .update import _update_many
+from .delete import _delete_many
+
+# Globals and constants variables.
+
+
+class Session:
+    """
+    Unit of work queuing inserts, updates and deletes of dataclass instances.
+    Queued operations are written by :meth:`flush`, grouped by table, and
+    committed in a single transaction by :meth:`commit`.
+    Used as a context manager, the session is committed on exit, or rolled back
+    if an exception was raised.
+
+    Example::
+
+        with dataclasses_sql.Session(metadata) as session:
+            session.add(car)
+            session.delete(othercar)
+    """
+
+    def __init__(self, metadata, check_exists=True, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.metadata = metadata
+        self.check_exists = check_exists
+        self.chunk_size = chunk_size
+
+        self._inserts = []
+        self._updates = []
+        self._deletes = []
+
+        self._connection = None
+        self._transaction = None
+        self._journal = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def add(self, data):
+        """
+        Queues the insert of a dataclass instance.
+        """
+        self._inserts.append(data)
+
+    def add_all(self, iterable):
+        """
+        Queues the insert of many dataclass instances.
+        """
+        self._inserts.extend(iterable)
+
+    def update(self, data):
+        """
+        Queues the update of a dataclass instance.
+        """
+        self._updates.append(data)
+
+    def delete(self, data):
+        """
+        Queues the delete of a dataclass instance.
+        """
+        self._deletes.append(data)
+
+    def flush(self):
+        """
+        Writes the queued operations in the transaction of the session:
+        inserts, updates and then deletes.
+        Inserts are grouped by table, nested dataclasses first.
+        """
+        if self._connection is None:
+            self._connection = self.metadata.bind.connect()
+            self._transaction = self._connection.begin()
+            self._journal = _Journal(self.metadata)
+
+        inserts, self._inserts = self._inserts, []
+        updates, self._updates = self._updates, []
+        deletes, self._deletes = self._deletes, []
+
+        _insert_many(
+            self._connection,
+            self.metadata,
+            inserts,
+            self.check_exists,
+            self.chunk_size,
+            self._journal,
+        )
+        _update_many(
+            self._connection, self.metadata, updates, self.chunk_size, self._journal
+        )
+        _delete_many(
+            self._connection, self.metadata, deletes, self.chunk_size, self._journal
+        )
+
+    def commit(self):
+        """
+        Flushes the queued operations and commits the transaction.
+        If either fails, the transaction is rolled back.
+        """
+        try:
+            self.flush()
+            self._transaction.commit()
+        except Exception:
+            self.rollback()
+            raise
+
+        self._journal.invalidate()
+        self._close()
+
+    def rollback(self):
+        """
+        Discards the queued operations and rolls back the flushed ones.
+        The rowids and snapshots of flushed instances are restored and, as
+        other rowids may no longer be valid, the identity map is cleared.
+        """
+        self._inserts.clear()
+        self._updates.clear()
+        self._deletes.clear()
+
+        if self._transaction is None:
+            return
+
+        try:
+            self._transaction.rollback()
+        finally:
+            self._journal.revert()
+            self._close()
+
+        identity_map = get_identity_map(self.metadata)
+        if identity_map is not None:
+            identity_map.clear()
+
+    def _close(self):
+        self._connection.close()
+        self._connection = None
+        self._transaction = None
+        self._journal = None
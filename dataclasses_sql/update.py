@@ -1,14 +1,24 @@
 """"""
 
 # Standard library modules.
-import dataclasses
+import itertools
 
 # Third party modules.
 from loguru import logger
 
 # Local modules.
-from .base import get_rowid, require_table
-from .insert import insert
+from .base import (
+    DEFAULT_CHUNK_SIZE,
+    get_mapping,
+    get_statements,
+    require_table,
+    _get_rowids,
+    _with_compiled_cache,
+    _forget_rowid,
+    _remember_rowids,
+    _Journal,
+)
+from .insert import _insert_many
 
 # Globals and constants variables.
 
@@ -16,29 +26,109 @@ from .insert import insert
 def update(metadata, data):
     """
     Update a dataclass instance into database.
-    Returns ``True`` if successful.
+    Only the columns changed since the instance was inserted, loaded or last
+    updated are written.
+    Returns ``True`` if successful, ``False`` if nothing changed.
     """
+    with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+        count = _update_many(conn, metadata, [data], DEFAULT_CHUNK_SIZE, journal)
+
+    return count == 1
+
+
+def update_many(metadata, instances, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Update many dataclass instances into database.
+    The instances are updated by chunks of *chunk_size*, each in its own
+    transaction: their rowids are found in bulk and instances with the same
+    changed columns are updated with one statement.
+    Returns the number of updated instances.
+    """
+    iterator = iter(instances)
+
+    count = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return count
+
+        with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+            count += _update_many(conn, metadata, chunk, chunk_size, journal)
+
+
+def _update_many(conn, metadata, iterable, chunk_size, journal):
+    conn = _with_compiled_cache(conn, metadata)
+
     # Find if data exists
-    rowid = get_rowid(metadata, data)
-    if rowid is None:
-        raise ValueError("Data does not exists")
-
-    # Create row
-    row = {}
-    for field in dataclasses.fields(data):
-        name = field.name
-        value = getattr(data, name)
-
-        if dataclasses.is_dataclass(value):
-            insert(metadata, value, check_exists=False)
-            row[name + "_id"] = int(value._rowid)
-        else:
-            row[name] = value
-
-    # Update
-    table = require_table(metadata, data)
-
-    with metadata.bind.begin() as conn:
-        conn.execute(table.update().where(table.c.id == rowid), row)
-        logger.debug(f"Updated {data} to table {table.name}")
-        return True
+    datas = list(iterable)
+    journal.record(datas)
+    _get_rowids(conn, metadata, datas, chunk_size)
+
+    # Group by dataclass
+    groups = {}
+    for data in datas:
+        if not hasattr(data, "_rowid"):
+            raise ValueError("Data does not exists")
+        groups.setdefault(type(data), {})[id(data)] = data
+
+    count = 0
+    for dataclass, datas in groups.items():
+        datas = list(datas.values())
+        mapping = get_mapping(dataclass)
+
+        # Insert nested dataclasses which do not exist yet
+        for field in mapping.nested_fields:
+            values = [getattr(data, field.name) for data in datas]
+            _insert_many(conn, metadata, values, True, chunk_size, journal)
+
+        table = require_table(metadata, dataclass, bind=conn)
+        statement = get_statements(table).update
+
+        # Group by changed columns, as an executemany sets the same columns
+        changes = {}
+        for data in datas:
+            row = mapping.to_row(data)
+            values = _changed_values(data, row)
+            if not values:
+                continue
+
+            values["_rowid"] = data._rowid
+            changes.setdefault(frozenset(values), []).append((data, row, values))
+
+        # Update
+        for items in changes.values():
+            for i in range(0, len(items), chunk_size):
+                chunk = items[i : i + chunk_size]
+
+                result = conn.execute(
+                    statement, [values for _data, _row, values in chunk]
+                )
+                logger.debug(f"Updated {result.rowcount} rows to table {table.name}")
+                journal.record_table(table)
+                count += result.rowcount
+
+                # Key fields may have changed
+                for data, row, _values in chunk:
+                    data._snapshot = row
+                    _forget_rowid(metadata, table, data._rowid)
+                _remember_rowids(
+                    metadata, table, [data for data, _row, _values in chunk]
+                )
+
+    return count
+
+
+def _changed_values(data, row):
+    """
+    Returns the values of the row which differ from the snapshot of the
+    instance, all values if the instance has no snapshot.
+    """
+    snapshot = getattr(data, "_snapshot", None)
+    if snapshot is None:
+        return dict(row)
+
+    return dict(
+        (name, value)
+        for name, value in row.items()
+        if name not in snapshot or snapshot[name] != value
+    )
@@ -0,0 +1,164 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+import sqlalchemy.dialects.postgresql
+import sqlalchemy.dialects.sqlite
+from loguru import logger
+
+# Local modules.
+from .base import (
+    DEFAULT_CHUNK_SIZE,
+    get_mapping,
+    require_key_index,
+    _find_rowids,
+    _key_values,
+    _remember_rowids,
+    _Journal,
+)
+from .insert import _insert_many
+
+# Globals and constants variables.
+_INSERT_LOOKUP = {
+    "sqlite": sqlalchemy.dialects.sqlite.insert,
+    "postgresql": sqlalchemy.dialects.postgresql.insert,
+}
+
+_ON_CONFLICTS = ("ignore", "update")
+
+
+def upsert(metadata, data, on_conflict="ignore"):
+    """
+    Insert a dataclass instance into database, or if a row with the same key
+    fields exists, ignore the instance (``on_conflict="ignore"``) or update
+    the row (``on_conflict="update"``).
+    A unique index over the key fields is created if it doesn't exist.
+    Returns the rowid of the instance.
+    """
+    with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+        _upsert_many(conn, metadata, [data], on_conflict, DEFAULT_CHUNK_SIZE, journal)
+
+    return data._rowid
+
+
+def upsert_many(
+    metadata, iterable, on_conflict="ignore", chunk_size=DEFAULT_CHUNK_SIZE
+):
+    """
+    Upsert many dataclass instances into database in a single transaction.
+    See :func:`upsert`.
+    Instances with the same key fields share a row, written from the last
+    instance when updated, as by successive upserts, or the first one otherwise.
+    Returns the rowid of each instance.
+    """
+    datas = list(iterable)
+
+    with _Journal(metadata) as journal, metadata.bind.begin() as conn:
+        _upsert_many(conn, metadata, datas, on_conflict, chunk_size, journal)
+
+    return [data._rowid for data in datas]
+
+
+def _upsert_many(conn, metadata, iterable, on_conflict, chunk_size, journal):
+    if on_conflict not in _ON_CONFLICTS:
+        valid_on_conflicts_str = ", ".join(_ON_CONFLICTS)
+        raise ValueError(
+            f"Unknown on_conflict: {on_conflict}, valid values: {valid_on_conflicts_str}"
+        )
+
+    dialect_name = conn.dialect.name
+    if dialect_name not in _INSERT_LOOKUP:
+        raise ValueError(f"Upsert is not supported by dialect {dialect_name}")
+
+    # Group by dataclass
+    groups = {}
+    for data in iterable:
+        if data is None:
+            continue
+        if on_conflict == "ignore" and hasattr(data, "_rowid"):
+            continue
+        groups.setdefault(type(data), {})[id(data)] = data
+
+    for dataclass, datas in groups.items():
+        datas = list(datas.values())
+        journal.record(datas)
+        mapping = get_mapping(dataclass)
+
+        # Upsert nested dataclasses, those without key fields cannot conflict
+        # and are inserted
+        for field in mapping.nested_fields:
+            values = [getattr(data, field.name) for data in datas]
+            if get_mapping(field.type).keyfields:
+                _upsert_many(conn, metadata, values, on_conflict, chunk_size, journal)
+            else:
+                _insert_many(conn, metadata, values, True, chunk_size, journal)
+
+        index = require_key_index(metadata, dataclass, unique=True, bind=conn)
+        table = index.table
+
+        # Create statement
+        statement = _INSERT_LOOKUP[dialect_name](table)
+
+        column_names = set(mapping.column_names[1:]) - set(mapping.key_column_names)
+        if on_conflict == "update" and column_names:
+            statement = statement.on_conflict_do_update(
+                index_elements=list(index.columns),
+                set_=dict((name, statement.excluded[name]) for name in column_names),
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(
+                index_elements=list(index.columns)
+            )
+
+        # Remove duplicates, they share the row of the written instance: the
+        # last one when updated, as by successive upserts, the first one otherwise
+        duplicates = {}
+        for data in datas:
+            values = _key_values(data, mapping)
+            duplicates.setdefault(values, []).append(data)
+
+        duplicates = list(duplicates.values())
+        written_index = -1 if on_conflict == "update" else 0
+        datas = [others[written_index] for others in duplicates]
+
+        # Upsert
+        returning = getattr(conn.dialect, "full_returning", False)
+
+        for i in range(0, len(datas), chunk_size):
+            chunk = datas[i : i + chunk_size]
+            rows = [mapping.to_row(data) for data in chunk]
+
+            # Existing rows are only known to match the instances when updated
+            for data, row in zip(chunk, rows):
+                if hasattr(data, "_rowid"):
+                    del data._rowid
+                if on_conflict == "update":
+                    data._snapshot = row
+                elif hasattr(data, "_snapshot"):
+                    del data._snapshot
+
+            # Rows are only all returned when they are either inserted or updated
+            if returning and on_conflict == "update" and column_names:
+                result = conn.execute(statement.values(rows).returning(table.c.id))
+                for data, row in zip(chunk, result):
+                    data._rowid = row[0]
+            else:
+                conn.execute(statement, rows)
+                _find_rowids(conn, metadata, table, mapping, chunk, chunk_size)
+
+            _remember_rowids(metadata, table, chunk)
+            logger.debug(f"Upserted {len(chunk)} rows to table {table.name}")
+            journal.record_table(table)
+
+        for others in duplicates:
+            written = others[written_index]
+            for data in others:
+                if data is written:
+                    continue
+
+                data._rowid = written._rowid
+                if on_conflict == "update":
+                    data._snapshot = dict(written._snapshot)
+                elif hasattr(data, "_snapshot"):
+                    del data._snapshot
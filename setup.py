@@ -25,6 +25,9 @@ with open(BASEDIR.joinpath("requirements-dev.txt"), "r") as fp:
     EXTRAS_REQUIRE["dev"] = fp.read().splitlines()
 with open(BASEDIR.joinpath("requirements-test.txt"), "r") as fp:
     EXTRAS_REQUIRE["test"] = fp.read().splitlines()
+EXTRAS_REQUIRE["numpy"] = ["numpy"]
+EXTRAS_REQUIRE["arrow"] = ["pyarrow"]
+EXTRAS_REQUIRE["asyncio"] = ["sqlalchemy[asyncio]"]
 
 CMDCLASS = versioneer.get_cmdclass()
 
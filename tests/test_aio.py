@@ -0,0 +1,101 @@
+""""""
+
+# Standard library modules.
+import asyncio
+
+# Third party modules.
+import pytest
+import sqlalchemy
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Local modules.
+import dataclasses_sql
+from dataclasses_sql import aio
+from .data import TaxonomyData, TreeData
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def engine():
+    return create_async_engine("sqlite+aiosqlite:///:memory:")
+
+
+@pytest.fixture
+def metadata():
+    return sqlalchemy.MetaData()
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_insert(engine, metadata, treedata):
+    assert run(aio.insert(engine, metadata, treedata))
+    assert treedata._rowid == 1
+    assert treedata.taxonomy._rowid == 1
+
+    other = TreeData(1, treedata.taxonomy, "Hibiscus abelmoschus")
+    assert not run(aio.insert(engine, metadata, other))
+    assert other._rowid == 1
+
+
+def test_get_rowid(engine, metadata, treedata):
+    async def main():
+        assert await aio.get_rowid(engine, metadata, treedata) is None
+
+        await aio.insert(engine, metadata, treedata)
+
+        taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+        other = TreeData(1, taxonomy, "Hibiscus abelmoschus")
+        return await aio.get_rowid(engine, metadata, other)
+
+    assert run(main()) == treedata._rowid
+
+
+def test_update_delete(engine, metadata, treedata):
+    async def main():
+        await aio.insert(engine, metadata, treedata)
+
+        treedata.diameter_m = 4.0
+        assert await aio.update(engine, metadata, treedata)
+        assert not await aio.update(engine, metadata, treedata)
+
+        builder = dataclasses_sql.SelectStatementBuilder()
+        builder.add_column(TreeData, "diameter_m")
+        rows = [row async for row in aio.stream(engine, metadata, builder)]
+        assert [row[0] for row in rows] == [pytest.approx(4.0)]
+
+        assert await aio.delete(engine, metadata, treedata)
+        rows = [row async for row in aio.stream(engine, metadata, builder)]
+        assert rows == []
+
+    run(main())
+
+
+def test_stream_objects(engine, metadata):
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    trees = [TreeData(i, taxonomy, "Hibiscus abelmoschus", i) for i in range(10)]
+
+    async def main():
+        await aio.insert_many(engine, metadata, trees)
+
+        builder = dataclasses_sql.SelectStatementBuilder()
+        builder.add_clause(TreeData, "diameter_m", 5.0, "<")
+        stream = aio.stream(engine, metadata, builder, 3, dataclass=TreeData)
+        return [data async for data in stream]
+
+    datas = run(main())
+    assert [data.serial_number for data in datas] == [0, 1, 2, 3, 4]
+    assert all(data.taxonomy is datas[0].taxonomy for data in datas[:3])
+
+
+def test_stream_objects_no_table(engine, metadata):
+    async def main():
+        builder = dataclasses_sql.SelectStatementBuilder()
+        stream = aio.stream(engine, metadata, builder, dataclass=TreeData)
+        return [data async for data in stream]
+
+    assert run(main()) == []
@@ -5,14 +5,33 @@ import dataclasses
 
 # Third party modules.
 import pytest
+import sqlalchemy
 
 # Local modules.
-from dataclasses_sql.base import iskeyfield, keyfields
+import dataclasses_sql
+from dataclasses_sql.base import (
+    iskeyfield,
+    keyfields,
+    get_mapping,
+    require_table,
+    require_key_index,
+    require_indexes,
+    Index,
+    get_rowid,
+    get_rowids,
+    sort_dataclasses,
+)
 from .data import TaxonomyData, TreeData
 
 # Globals and constants variables.
 
 
+@pytest.fixture
+def metadata():
+    engine = sqlalchemy.create_engine("sqlite:///:memory:")
+    return sqlalchemy.MetaData(engine)
+
+
 @pytest.mark.parametrize("dataclass,expected", [(TaxonomyData, 4), (TreeData, 3)])
 def test_iskeyfield(dataclass, expected):
     fields = dataclasses.fields(dataclass)
@@ -24,3 +43,181 @@ def test_iskeyfield(dataclass, expected):
 def test_keyfields(dataclass, expected):
     fields = keyfields(dataclass)
     assert len(fields) == expected
+
+
+def test_get_mapping(treedata):
+    mapping = get_mapping(treedata)
+    assert mapping is get_mapping(TreeData)
+
+    assert mapping.table_name == "treedata"
+    assert mapping.column_names[:4] == ("id", "serial_number", "taxonomy_id", "specie")
+    assert mapping.key_column_names == ("serial_number", "taxonomy_id", "specie")
+    assert mapping.nested_field_names == {"taxonomy"}
+    assert len(mapping.fields) == 8
+
+
+def test_mapping_to_row(treedata):
+    treedata.taxonomy._rowid = 5
+    row = get_mapping(treedata).to_row(treedata)
+
+    assert len(row) == 8
+    assert row["serial_number"] == 1
+    assert row["taxonomy_id"] == 5
+    assert row["diameter_m"] == pytest.approx(3.0, abs=1e-4)
+
+
+def test_mapping_from_row(treedata):
+    mapping = get_mapping(treedata)
+    row = [7] + list(mapping.to_row(treedata).values())
+
+    data = mapping.from_row(row, (treedata.taxonomy,))
+    assert data == treedata
+    assert data._rowid == 7
+
+    data = mapping.from_row(row)
+    assert data.taxonomy is None
+
+
+def test_mapping_from_row_init_false():
+    @dataclasses.dataclass
+    class Data:
+        key: str
+        count: int = dataclasses.field(init=False, default=0)
+
+    data = get_mapping(Data).from_row((1, "a", 3))
+    assert data.key == "a"
+    assert data.count == 3
+    assert data._rowid == 1
+
+
+def get_indexes(metadata, table_name):
+    inspector = sqlalchemy.inspect(metadata.bind)
+    return dict((index["name"], index) for index in inspector.get_indexes(table_name))
+
+
+def test_require_table_key_index(metadata):
+    require_table(metadata, TreeData)
+
+    indexes = get_indexes(metadata, "treedata")
+    index = indexes["ix_treedata_key"]
+    assert index["column_names"] == ["serial_number", "taxonomy_id", "specie"]
+    assert not index["unique"]
+
+    assert "ix_taxonomydata_key" in get_indexes(metadata, "taxonomydata")
+
+
+def test_require_table_unique_keys(metadata):
+    require_table(metadata, TaxonomyData, unique_keys=True)
+
+    indexes = get_indexes(metadata, "taxonomydata")
+    assert indexes["ix_taxonomydata_key"]["unique"]
+
+
+def test_require_key_index_existing_table(metadata):
+    with metadata.bind.begin() as conn:
+        conn.execute(
+            'create table taxonomydata (id integer primary key, kingdom varchar, "order" varchar, family varchar, genus varchar)'
+        )
+    metadata.reflect()
+    assert not get_indexes(metadata, "taxonomydata")
+
+    require_key_index(metadata, TaxonomyData)
+    assert not get_indexes(metadata, "taxonomydata")["ix_taxonomydata_key"]["unique"]
+
+    require_key_index(metadata, TaxonomyData, unique=True)
+    assert get_indexes(metadata, "taxonomydata")["ix_taxonomydata_key"]["unique"]
+
+
+@dataclasses.dataclass
+class ForestData:
+    __sql_indexes__ = (
+        Index("area_m2", "tree", where="area_m2 > 100.0"),
+        Index("name", include=["area_m2"], name="ix_forest_name"),
+    )
+
+    name: str = dataclasses.field(metadata={"key": True})
+    tree: TreeData = None
+    area_m2: float = dataclasses.field(default=None, metadata={"index": True})
+
+
+def test_require_table_indexes(metadata):
+    require_table(metadata, ForestData)
+
+    indexes = get_indexes(metadata, "forestdata")
+    assert indexes["ix_forestdata_area_m2"]["column_names"] == ["area_m2"]
+    assert indexes["ix_forestdata_area_m2_tree"]["column_names"] == [
+        "area_m2",
+        "tree_id",
+    ]
+    assert indexes["ix_forest_name"]["column_names"] == ["name", "area_m2"]
+
+    with metadata.bind.begin() as conn:
+        sql = conn.execute(
+            "select sql from sqlite_master where name = 'ix_forestdata_area_m2_tree'"
+        ).scalar()
+    assert "WHERE area_m2 > 100.0" in sql
+
+
+def test_require_indexes_existing_table(metadata):
+    with metadata.bind.begin() as conn:
+        conn.execute(
+            "create table forestdata (id integer primary key, name varchar, tree_id integer, area_m2 float)"
+        )
+    metadata.reflect()
+
+    require_indexes(metadata, ForestData)
+    assert len(get_indexes(metadata, "forestdata")) == 4
+
+
+def test_index_missing_column():
+    @dataclasses.dataclass
+    class Data:
+        __sql_indexes__ = (Index("doesnotexist"),)
+        name: str
+
+    with pytest.raises(ValueError):
+        get_mapping(Data)
+
+
+def test_sort_dataclasses():
+    assert sort_dataclasses([TreeData]) == [TaxonomyData, TreeData]
+    assert sort_dataclasses([TaxonomyData, TreeData]) == [TaxonomyData, TreeData]
+
+
+def test_sort_dataclasses_cycle():
+    @dataclasses.dataclass
+    class ParentData:
+        name: str
+        child: object = None
+
+    @dataclasses.dataclass
+    class ChildData:
+        name: str
+        parent: ParentData = None
+
+    ParentData.__dataclass_fields__["child"].type = ChildData
+
+    with pytest.raises(ValueError, match="ParentData -> ChildData -> ParentData"):
+        sort_dataclasses([ParentData])
+
+
+def test_get_rowid(metadata, treedata):
+    assert get_rowid(metadata, treedata) is None
+
+    dataclasses_sql.insert(metadata, treedata)
+    rowid = treedata._rowid
+
+    del treedata._rowid
+    del treedata.taxonomy._rowid
+    assert get_rowid(metadata, treedata) == rowid
+
+
+def test_get_rowids(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+
+    taxonomy = TaxonomyData("plantae", "MALVALES", "malvaceae", "hibiscus")
+    same = TreeData(1, taxonomy, "Hibiscus abelmoschus")
+    other = TreeData(2, taxonomy, "Hibiscus abelmoschus")
+
+    rowids = get_rowids(metadata, [same, other, same.taxonomy])
+    assert rowids == [treedata._rowid, None, treedata.taxonomy._rowid]
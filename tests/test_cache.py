@@ -0,0 +1,242 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+import pytest
+import sqlalchemy
+
+# Local modules.
+import dataclasses_sql
+from dataclasses_sql.cache import (
+    IdentityMap,
+    LRUCache,
+    ResultCache,
+    get_compiled_cache,
+)
+from .data import TaxonomyData, TreeData
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def metadata():
+    engine = sqlalchemy.create_engine("sqlite:///:memory:")
+    return sqlalchemy.MetaData(engine)
+
+
+def test_lrucache():
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+
+    cache["c"] = 3
+    assert len(cache) == 2
+    assert "b" not in cache
+    assert cache.get("b") is None
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.evictions == 1
+
+
+def test_identitymap():
+    identity_map = IdentityMap(maxsize=2)
+    identity_map.add("table", ("a",), 1)
+    identity_map.add("table", ("b",), 2)
+    assert identity_map.get("table", ("a",)) == 1
+
+    identity_map.add("table", ("c",), 3)
+    assert len(identity_map) == 2
+    assert identity_map.get("table", ("a",)) == 1
+    assert identity_map.get("table", ("b",)) is None
+    assert identity_map.get("table", ("c",)) == 3
+
+    assert identity_map.hits == 3
+    assert identity_map.misses == 1
+
+
+def test_identitymap_discard():
+    identity_map = IdentityMap()
+    identity_map.add("table", ("a",), 1)
+    identity_map.add("table", ("b",), 1)
+    assert identity_map.get("table", ("a",)) is None
+    assert identity_map.get("table", ("b",)) == 1
+
+    identity_map.discard("table", 1)
+    assert identity_map.get("table", ("b",)) is None
+    assert len(identity_map) == 0
+
+
+def test_identitymap_get_rowid(metadata, treedata):
+    identity_map = dataclasses_sql.enable_identity_map(metadata)
+    dataclasses_sql.insert(metadata, treedata)
+    assert len(identity_map) == 2
+
+    taxonomy = TaxonomyData("plantae", "malvales", "Malvaceae", "hibiscus")
+    other = TreeData(1, taxonomy, "Hibiscus abelmoschus")
+    assert dataclasses_sql.get_rowid(metadata, other) == treedata._rowid
+    assert taxonomy._rowid == treedata.taxonomy._rowid
+    assert identity_map.hits == 2
+
+
+def test_identitymap_delete(metadata, treedata):
+    identity_map = dataclasses_sql.enable_identity_map(metadata)
+    dataclasses_sql.insert(metadata, treedata)
+    dataclasses_sql.delete(metadata, treedata)
+    assert len(identity_map) == 1
+
+    other = TreeData(1, treedata.taxonomy, "Hibiscus abelmoschus")
+    assert dataclasses_sql.get_rowid(metadata, other) is None
+
+
+def test_identitymap_rollback(metadata):
+    identity_map = dataclasses_sql.enable_identity_map(metadata)
+    dataclasses_sql.require_table(metadata, TreeData)
+
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        dataclasses_sql.insert(metadata, TreeData(None, taxonomy, "Hibiscus"))
+
+    assert len(identity_map) == 0
+
+    other = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    assert dataclasses_sql.get_rowid(metadata, other) is None
+    assert not hasattr(other, "_rowid")
+
+
+def test_disable_identity_map(metadata, treedata):
+    dataclasses_sql.enable_identity_map(metadata)
+    dataclasses_sql.disable_identity_map(metadata)
+    dataclasses_sql.insert(metadata, treedata)
+
+    assert "dataclasses_sql.identity_map" not in metadata.info
+
+
+def test_compiled_cache(metadata):
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    trees = [TreeData(i, taxonomy, "Hibiscus abelmoschus") for i in range(5)]
+    for treedata in trees:
+        dataclasses_sql.insert(metadata, treedata, check_exists=False)
+
+    compiled_cache = get_compiled_cache(metadata)
+    misses = compiled_cache.misses
+    assert compiled_cache.hits >= 4
+
+    for treedata in trees:
+        treedata.diameter_m = 2.0
+        dataclasses_sql.update(metadata, treedata)
+    for treedata in trees:
+        dataclasses_sql.delete(metadata, treedata)
+
+    # Compiled once for update and once for delete
+    assert compiled_cache.misses - misses == 2
+    other = TreeData(0, taxonomy, "Hibiscus abelmoschus")
+    assert dataclasses_sql.get_rowid(metadata, other) is None
+
+
+def test_resultcache():
+    result_cache = ResultCache(maxsize=2)
+    result_cache.add("a", frozenset(["table1"]), [(1,)])
+    result_cache.add("b", frozenset(["table1", "table2"]), [(2,)])
+    assert result_cache.get("a") == ((1,),)
+
+    result_cache.add("c", frozenset(["table2"]), [(3,)])
+    assert len(result_cache) == 2
+    assert result_cache.get("b") is None
+    assert result_cache.evictions == 1
+
+    result_cache.invalidate("table2")
+    assert result_cache.get("a") == ((1,),)
+    assert result_cache.get("c") is None
+    assert result_cache.invalidations == 1
+
+    assert result_cache.hits == 2
+    assert result_cache.misses == 2
+
+
+def test_resultcache_maxbytes():
+    result_cache = ResultCache(maxbytes=1000)
+    result_cache.add("a", frozenset(["table"]), [(b"a" * 100,)])
+    result_cache.add("b", frozenset(["table"]), [(b"b" * 500,)])
+    result_cache.add("c", frozenset(["table"]), [(b"c" * 5000,)])
+
+    assert result_cache.get("a") is not None
+    assert result_cache.get("b") is not None
+    assert result_cache.get("c") is None
+    assert result_cache.nbytes <= 1000
+
+    result_cache.add("d", frozenset(["table"]), [(b"d" * 500,)])
+    assert result_cache.get("a") is None
+    assert result_cache.nbytes <= 1000
+
+
+def test_resultcache_ttl(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr("time.monotonic", lambda: now)
+
+    result_cache = ResultCache(ttl=10)
+    result_cache.add("a", frozenset(["table"]), [(1,)])
+    assert result_cache.get("a") == ((1,),)
+
+    now = 111.0
+    assert result_cache.get("a") is None
+    assert len(result_cache) == 0
+
+
+def test_result_cache_fetchall(metadata, treedata):
+    result_cache = dataclasses_sql.enable_result_cache(metadata)
+    dataclasses_sql.insert(metadata, treedata)
+
+    def fetch_serial_numbers():
+        builder = dataclasses_sql.SelectStatementBuilder()
+        builder.add_column(TreeData, "serial_number")
+        builder.add_join(TreeData, TaxonomyData)
+        builder.add_clause(TaxonomyData, "genus", ["hibiscus", "rosa"], "in")
+        return [row[0] for row in builder.fetchall(metadata)]
+
+    assert fetch_serial_numbers() == [1]
+    assert fetch_serial_numbers() == [1]
+    assert result_cache.hits == 1
+    assert result_cache.misses == 1
+
+    # Invalidated by a write to one of the tables
+    other = TreeData(2, treedata.taxonomy, "Hibiscus abelmoschus")
+    dataclasses_sql.insert(metadata, other)
+    assert fetch_serial_numbers() == [1, 2]
+
+    treedata.taxonomy.genus = "quercus"
+    dataclasses_sql.update(metadata, treedata.taxonomy)
+    assert fetch_serial_numbers() == []
+
+    dataclasses_sql.disable_result_cache(metadata)
+    assert "dataclasses_sql.result_cache" not in metadata.info
+
+
+def test_result_cache_session(tmp_path, treedata):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'trees.db'}")
+    metadata = sqlalchemy.MetaData(engine)
+    dataclasses_sql.enable_result_cache(metadata)
+    dataclasses_sql.insert(metadata, treedata)
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "serial_number")
+
+    # Rows read before the commit are not kept after it
+    with dataclasses_sql.Session(metadata) as session:
+        session.add(TreeData(2, treedata.taxonomy, "Hibiscus abelmoschus"))
+        session.flush()
+        assert len(builder.fetchall(metadata)) == 1
+
+    assert len(builder.fetchall(metadata)) == 2
+
+    # Nor after a rollback
+    with pytest.raises(RuntimeError):
+        with dataclasses_sql.Session(metadata) as session:
+            session.delete(treedata)
+            session.flush()
+            builder.fetchall(metadata)
+            raise RuntimeError
+
+    assert len(builder.fetchall(metadata)) == 2
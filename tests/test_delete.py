@@ -8,6 +8,7 @@ import sqlalchemy
 
 # Local modules.
 import dataclasses_sql
+from .data import TaxonomyData, TreeData
 
 # Globals and constants variables.
 
@@ -38,3 +39,90 @@ def test_delete(metadata, treedata):
         rows = conn.execute("select * from treedata").fetchall()
 
     assert len(rows) == 0
+    assert not hasattr(treedata, "_rowid")
+    assert not hasattr(treedata, "_snapshot")
+
+    # The rowid of the deleted instance may be reused
+    other = TreeData(2, treedata.taxonomy, "Hibiscus abelmoschus")
+    dataclasses_sql.insert(metadata, other)
+    assert dataclasses_sql.insert(metadata, treedata)
+    assert treedata._rowid != other._rowid
+
+
+@pytest.fixture
+def trees(metadata):
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    trees = [TreeData(i, taxonomy, "Hibiscus abelmoschus", i) for i in range(10)]
+    dataclasses_sql.insert_many(metadata, trees)
+    return trees
+
+
+def test_delete_many(metadata, trees):
+    others = [TreeData(i, trees[0].taxonomy, "Hibiscus abelmoschus") for i in (8, 9)]
+
+    count = dataclasses_sql.delete_many(metadata, trees[:3] + others, chunk_size=2)
+    assert count == 5
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select serial_number from treedata").fetchall()
+
+    assert [row[0] for row in rows] == [3, 4, 5, 6, 7]
+
+
+def test_delete_many_count(metadata, trees):
+    # Rows already deleted are not counted
+    dataclasses_sql.delete_where(metadata, TreeData, [(TreeData, "serial_number", 5)])
+    assert dataclasses_sql.delete_many(metadata, trees[4:6]) == 1
+    assert not hasattr(trees[5], "_rowid")
+
+
+def test_delete_many_no_data(metadata, trees):
+    other = TreeData(10, trees[0].taxonomy, "Hibiscus abelmoschus")
+
+    with pytest.raises(ValueError):
+        dataclasses_sql.delete_many(metadata, [trees[0], other])
+
+    assert dataclasses_sql.exists(metadata, trees[0])
+
+
+def test_delete_where(metadata, trees):
+    identity_map = dataclasses_sql.enable_identity_map(metadata)
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    others = [TreeData(i, taxonomy, "Hibiscus abelmoschus") for i in range(10)]
+    dataclasses_sql.get_rowids(metadata, others)
+    assert len(identity_map) == 11
+
+    where = [(TreeData, "diameter_m", 5.0, ">="), (TreeData, "serial_number", 9, "!=")]
+    count = dataclasses_sql.delete_where(metadata, TreeData, where)
+    assert count == 4
+    assert len(identity_map) == 7
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select serial_number from treedata").fetchall()
+
+    assert [row[0] for row in rows] == [0, 1, 2, 3, 4, 9]
+
+
+def test_delete_where_nested(metadata, trees):
+    where = [(TaxonomyData, "genus", "hibiscus")]
+
+    with pytest.raises(ValueError):
+        dataclasses_sql.delete_where(metadata, TreeData, where)
+
+
+def test_delete_where_nested_column(metadata, trees):
+    taxonomy = TaxonomyData("plantae", "rosales", "rosaceae", "rosa")
+    dataclasses_sql.insert(metadata, TreeData(20, taxonomy, "Rosa canina"))
+
+    where = [(TreeData, "taxonomy", taxonomy._rowid)]
+    assert dataclasses_sql.delete_where(metadata, TreeData, where) == 1
+
+    where = [(TreeData, "taxonomy_id", taxonomy._rowid)]
+    assert dataclasses_sql.delete_where(metadata, TreeData, where) == 0
+
+    with pytest.raises(ValueError):
+        dataclasses_sql.delete_where(metadata, TreeData, [(TreeData, "taxid", 1)])
+
+
+def test_delete_where_no_table(metadata):
+    assert dataclasses_sql.delete_where(metadata, TreeData, []) == 0
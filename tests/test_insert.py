@@ -1,6 +1,7 @@
 """"""
 
 # Standard library modules.
+import dataclasses
 
 # Third party modules.
 import pytest
@@ -8,6 +9,7 @@ import sqlalchemy
 
 # Local modules.
 import dataclasses_sql
+from .data import TaxonomyData, TreeData
 
 # Globals and constants variables.
 
@@ -78,3 +80,178 @@ def test_exists(metadata, treedata):
     success = dataclasses_sql.insert(metadata, treedata)
     assert success
     assert dataclasses_sql.exists(metadata, treedata)
+
+
+def test_exists_many(metadata, treedata):
+    other = TreeData(2, treedata.taxonomy, "Hibiscus abelmoschus")
+    assert dataclasses_sql.exists_many(metadata, [treedata, other]) == [False, False]
+
+    success = dataclasses_sql.insert(metadata, treedata)
+    assert success
+    assert dataclasses_sql.exists_many(metadata, [treedata, other]) == [True, False]
+
+
+def create_trees(count):
+    trees = []
+    for i in range(count):
+        taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+        trees.append(TreeData(i, taxonomy, "Hibiscus abelmoschus", diameter_m=i))
+    return trees
+
+
+def test_insert_many(metadata):
+    trees = create_trees(10)
+    count = dataclasses_sql.insert_many(metadata, trees, chunk_size=3)
+    assert count == 10
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from treedata order by id").fetchall()
+        assert len(rows) == 10
+
+        rows_taxonomy = conn.execute("select * from taxonomydata").fetchall()
+        assert len(rows_taxonomy) == 1
+
+    for tree, row in zip(trees, rows):
+        assert tree._rowid == row["id"]
+        assert tree.serial_number == row["serial_number"]
+        assert tree.taxonomy._rowid == row["taxonomy_id"]
+
+
+def test_insert_many_check_exists(metadata, treedata):
+    success = dataclasses_sql.insert(metadata, treedata)
+    assert success
+
+    trees = create_trees(3)
+    trees[1].serial_number = treedata.serial_number
+    trees[2].serial_number = treedata.serial_number
+    trees[2].taxonomy.genus = "HIBISCUS"
+
+    count = dataclasses_sql.insert_many(metadata, trees)
+    assert count == 1
+    assert trees[1]._rowid == treedata._rowid
+    assert trees[2]._rowid == treedata._rowid
+    assert trees[0].taxonomy._rowid == treedata.taxonomy._rowid
+
+
+def test_insert_many_duplicates(metadata):
+    trees = create_trees(2) + create_trees(2)
+
+    count = dataclasses_sql.insert_many(metadata, trees)
+    assert count == 2
+    assert trees[0]._rowid == trees[2]._rowid
+    assert trees[1]._rowid == trees[3]._rowid
+
+
+def test_insert_many_no_check_exists(metadata):
+    trees = create_trees(2) + create_trees(2)
+
+    count = dataclasses_sql.insert_many(metadata, trees, check_exists=False)
+    assert count == 4
+
+    # Nested instances are still deduplicated by key
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from taxonomydata").fetchall()
+
+    assert len(rows) == 1
+    assert len(set(tree.taxonomy._rowid for tree in trees)) == 1
+
+
+@dataclasses.dataclass
+class NoteData:
+    text: str = None
+
+
+@dataclasses.dataclass
+class SeedData:
+    lot_number: int = dataclasses.field(metadata={"key": True})
+    taxonomy: TaxonomyData = dataclasses.field(metadata={"key": True})
+
+
+@dataclasses.dataclass
+class SeedBagData:
+    lot_number: int = dataclasses.field(metadata={"key": True})
+    note: NoteData = None
+
+
+def test_insert_many_graph(metadata):
+    taxonomies = [
+        TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus"),
+        TaxonomyData("plantae", "rosales", "rosaceae", "rosa"),
+    ]
+    datas = []
+    for i in range(6):
+        datas.append(TreeData(i, taxonomies[i % 2], "Hibiscus abelmoschus"))
+        taxonomy = TaxonomyData("plantae", "fagales", "fagaceae", "quercus")
+        datas.append(SeedData(i, taxonomy))
+
+    # Create the tables beforehand
+    dataclasses_sql.require_table(metadata, TreeData)
+    dataclasses_sql.require_table(metadata, SeedData)
+
+    statements = []
+
+    @sqlalchemy.event.listens_for(metadata.bind, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.startswith("INSERT"):
+            statements.append(statement.split()[2])
+
+    count = dataclasses_sql.insert_many(metadata, datas)
+    assert count == 12
+    assert statements == ["taxonomydata", "treedata", "seeddata"]
+
+    assert datas[1].taxonomy._rowid == datas[3].taxonomy._rowid
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from taxonomydata").fetchall()
+
+    assert len(rows) == 3
+
+
+def test_insert_many_failure(metadata):
+    dataclasses_sql.require_table(metadata, TreeData)
+
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    data = TreeData(None, taxonomy, "Hibiscus abelmoschus")
+
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        dataclasses_sql.insert_many(metadata, [data])
+
+    assert not hasattr(taxonomy, "_rowid")
+    assert not hasattr(taxonomy, "_snapshot")
+    assert not hasattr(data, "_rowid")
+
+    # Retry with a valid instance
+    data.serial_number = 1
+    assert dataclasses_sql.insert_many(metadata, [data]) == 1
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from taxonomydata").fetchall()
+
+    assert len(rows) == 1
+    assert rows[0]["id"] == taxonomy._rowid
+
+
+def test_insert_many_failure_create_table(metadata):
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        dataclasses_sql.insert_many(metadata, [TreeData(None, taxonomy, "Hibiscus")])
+
+    # Tables created in the failed transaction are created again
+    count = dataclasses_sql.insert_many(metadata, [TreeData(1, taxonomy, "Hibiscus")])
+    assert count == 1
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from treedata").fetchall()
+
+    assert len(rows) == 1
+
+
+def test_insert_many_nested_no_key(metadata):
+    dataclasses_sql.require_table(metadata, SeedBagData)
+
+    bags = [SeedBagData(i, NoteData(f"bag {i}")) for i in range(3)]
+    assert dataclasses_sql.insert_many(metadata, bags) == 3
+
+    # Instances without key fields are not duplicates of each other
+    assert len(set(bag.note._rowid for bag in bags)) == 3
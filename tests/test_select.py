@@ -180,3 +180,452 @@ def test_select_with_join_and_clause(metadata):
         rows = conn.execute(statement).fetchall()
 
     assert len(rows) == 1
+
+
+def test_fetch_objects(metadata, treedata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_clause(TreeData, "diameter_m", 3, ">=")
+    datas = builder.fetch_objects(metadata, TreeData)
+
+    assert len(datas) == 1
+
+    data = datas[0]
+    assert data.serial_number == treedata.serial_number
+    assert data.taxonomy == treedata.taxonomy
+    assert data.plantation_datetime == treedata.plantation_datetime
+    assert data._rowid == treedata._rowid
+    assert data.taxonomy._rowid == treedata.taxonomy._rowid
+
+
+def test_fetch_objects_shared(metadata, treedata):
+    other = TreeData(2, treedata.taxonomy, "Hibiscus abelmoschus")
+    dataclasses_sql.insert(metadata, other)
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_clause(TaxonomyData, "genus", "hibiscus")
+    datas = builder.fetch_objects(metadata, TreeData)
+
+    assert len(datas) == 2
+    assert datas[0].taxonomy is datas[1].taxonomy
+
+
+def test_fetch_objects_invalid_clause(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_clause(TreeData, "diameter_m", 3, ">=")
+
+    with pytest.raises(ValueError):
+        builder.fetch_objects(metadata, TaxonomyData)
+
+
+def test_select_objects(metadata):
+    datas = dataclasses_sql.select_objects(metadata, TaxonomyData)
+    assert len(datas) == 2
+
+    datas = dataclasses_sql.select_objects(
+        metadata, TaxonomyData, where=[(TaxonomyData, "genus", "rosa")]
+    )
+    assert len(datas) == 1
+    assert datas[0].genus == "rosa"
+
+
+def test_select_objects_nested_column(metadata):
+    taxonomy = dataclasses_sql.select_objects(
+        metadata, TaxonomyData, where=[(TaxonomyData, "genus", "hibiscus")]
+    )[0]
+
+    # A nested dataclass is referred by its rowid
+    for column_name in ["taxonomy", "taxonomy_id"]:
+        where = [(TreeData, column_name, taxonomy._rowid)]
+        datas = dataclasses_sql.select_objects(metadata, TreeData, where=where)
+        assert datas
+        assert all(data.taxonomy == taxonomy for data in datas)
+
+    with pytest.raises(ValueError):
+        where = [(TreeData, "taxid", 1)]
+        dataclasses_sql.select_objects(metadata, TreeData, where=where)
+
+
+def test_select_objects_no_table(metadata):
+    assert dataclasses_sql.select_objects(metadata, TreeData) != []
+
+    engine = sqlalchemy.create_engine("sqlite:///:memory:")
+    assert dataclasses_sql.select_objects(sqlalchemy.MetaData(engine), TreeData) == []
+
+
+def test_stream(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_all_columns(TaxonomyData)
+
+    rows = list(builder.stream(metadata, chunk_size=1))
+    assert len(rows) == 2
+    assert rows[0]["genus"] == "hibiscus"
+
+
+def test_stream_dataclass(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_clause(TaxonomyData, "genus", "rosa", "!=")
+
+    datas = list(builder.stream(metadata, chunk_size=1, dataclass=TreeData))
+    assert len(datas) == 1
+    assert datas[0].taxonomy.genus == "hibiscus"
+
+
+def test_fetch_columns_numpy(metadata):
+    numpy = pytest.importorskip("numpy")
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "id")
+    builder.add_column(TreeData, "diameter_m")
+    builder.add_column(TreeData, "plantation_datetime", label="datetime")
+    builder.add_column(TreeData, "has_flower")
+    builder.add_column(TreeData, "specie")
+    columns = builder.fetch_columns(metadata, chunk_size=1)
+
+    assert columns["id"].dtype == numpy.int64
+    assert columns["diameter_m"].dtype == numpy.float64
+    assert columns["diameter_m"][0] == pytest.approx(3.0, abs=1e-4)
+    assert columns["datetime"][0] == numpy.datetime64("2019-07-21T18:54:21")
+    assert columns["has_flower"].dtype == numpy.bool_
+    assert columns["specie"][0] == "Hibiscus abelmoschus"
+
+
+def test_fetch_columns_numpy_empty(metadata):
+    numpy = pytest.importorskip("numpy")
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "diameter_m")
+    builder.add_clause(TreeData, "diameter_m", 10.0, ">")
+    columns = builder.fetch_columns(metadata)
+
+    assert columns["diameter_m"].dtype == numpy.float64
+    assert len(columns["diameter_m"]) == 0
+
+
+def test_fetch_columns_arrow(metadata):
+    pyarrow = pytest.importorskip("pyarrow")
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_all_columns(TaxonomyData)
+    builder.add_column(TreeData, "plantation_datetime")
+    builder.add_column(TreeData, "last_pruning_date")
+    builder.add_join(TreeData, TaxonomyData)
+    table = builder.fetch_columns(metadata, backend="arrow")
+
+    assert table.num_rows == 1
+    assert table.column("id").type == pyarrow.int64()
+    assert table.column("plantation_datetime").type == pyarrow.timestamp("us")
+    assert table.column("last_pruning_date").type == pyarrow.date32()
+    assert table.column("genus").to_pylist() == ["hibiscus"]
+
+
+def test_fetch_columns_duplicate(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "id")
+    builder.add_column(TaxonomyData, "id")
+
+    with pytest.raises(ValueError):
+        builder.fetch_columns(metadata)
+
+
+def test_fetch_columns_invalid_backend(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "id")
+
+    with pytest.raises(ValueError):
+        builder.fetch_columns(metadata, backend="pandas")
+
+
+def test_prepare_cache(metadata):
+    def create_builder(genus):
+        builder = dataclasses_sql.SelectStatementBuilder()
+        builder.add_all_columns(TaxonomyData)
+        builder.add_clause(TaxonomyData, "genus", genus)
+        return builder
+
+    builder1 = create_builder("rosa")
+    builder2 = create_builder("hibiscus")
+    assert builder1.cache_key() == builder2.cache_key()
+
+    statement1, params1 = builder1.prepare()
+    statement2, params2 = builder2.prepare()
+    assert statement1 is statement2
+    assert params1 != params2
+
+    with metadata.bind.begin() as conn:
+        assert conn.execute(statement1, params1).fetchone()["genus"] == "rosa"
+        assert conn.execute(statement2, params2).fetchone()["genus"] == "hibiscus"
+        assert conn.execute(builder2.build()).fetchone()["genus"] == "hibiscus"
+
+
+def test_prepare_cache_in(metadata):
+    builder1 = dataclasses_sql.SelectStatementBuilder()
+    builder1.add_all_columns(TaxonomyData)
+    builder1.add_clause(TaxonomyData, "genus", ["rosa"], "in")
+
+    builder2 = dataclasses_sql.SelectStatementBuilder()
+    builder2.add_all_columns(TaxonomyData)
+    builder2.add_clause(TaxonomyData, "genus", ["rosa", "hibiscus"], "in")
+
+    assert builder1.prepare()[0] is builder2.prepare()[0]
+
+    with metadata.bind.begin() as conn:
+        assert len(conn.execute(builder1.build()).fetchall()) == 1
+        assert len(conn.execute(builder2.build()).fetchall()) == 2
+
+
+def test_prepare_cache_null(metadata):
+    builder1 = dataclasses_sql.SelectStatementBuilder()
+    builder1.add_all_columns(TreeData)
+    builder1.add_clause(TreeData, "diameter_m", None)
+
+    builder2 = dataclasses_sql.SelectStatementBuilder()
+    builder2.add_all_columns(TreeData)
+    builder2.add_clause(TreeData, "diameter_m", 3.0)
+
+    assert builder1.cache_key() != builder2.cache_key()
+
+    with metadata.bind.begin() as conn:
+        assert len(conn.execute(builder1.build()).fetchall()) == 0
+        assert len(conn.execute(builder2.build()).fetchall()) == 1
+
+
+def test_prepare_cache_stats():
+    cache = dataclasses_sql.SelectStatementBuilder.statement_cache
+    hits = cache.hits
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "specie")
+    builder.build()
+    builder.build()
+
+    assert cache.hits >= hits + 1
+
+
+def insert_trees(metadata, count):
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    trees = [TreeData(i, taxonomy, f"Specie {i % 3}", i) for i in range(10, count + 10)]
+    dataclasses_sql.insert_many(metadata, trees)
+    return trees
+
+
+def test_order_by_limit(metadata):
+    insert_trees(metadata, 5)
+
+    builder = dataclasses_sql.SelectStatementBuilder(limit=3)
+    builder.add_column(TreeData, "serial_number")
+    builder.add_order_by(TreeData, "diameter_m", descending=True)
+
+    rows = builder.fetchall(metadata)
+    assert [row[0] for row in rows] == [14, 13, 12]
+
+
+def test_order_by_fetch_objects(metadata):
+    insert_trees(metadata, 5)
+
+    builder = dataclasses_sql.SelectStatementBuilder(limit=2)
+    builder.add_order_by(TreeData, "serial_number")
+
+    datas = builder.fetch_objects(metadata, TreeData)
+    assert [data.serial_number for data in datas] == [1, 10]
+
+
+def test_pages(metadata):
+    insert_trees(metadata, 10)
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_all_columns(TreeData)
+    builder.add_clause(TreeData, "serial_number", 10, ">=")
+
+    pages = list(builder.pages(metadata, page_size=4))
+    assert [len(rows) for rows in pages] == [4, 4, 2]
+
+    serial_numbers = [row["serial_number"] for rows in pages for row in rows]
+    assert serial_numbers == list(range(10, 20))
+
+
+def test_pages_composite_key(metadata):
+    insert_trees(metadata, 9)
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "specie")
+    builder.add_column(TreeData, "serial_number")
+    builder.add_join(TreeData, TaxonomyData)
+    builder.add_clause(TaxonomyData, "genus", "hibiscus")
+
+    key = [(TreeData, "specie"), (TreeData, "serial_number")]
+    pages = list(builder.pages(metadata, key=key, page_size=3))
+    assert len(pages) == 4
+
+    rows = [tuple(row) for rows in pages for row in rows]
+    assert rows == sorted(rows)
+    assert len(rows) == 10
+
+
+def test_pages_invalid_key(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "serial_number")
+
+    with pytest.raises(ValueError):
+        list(builder.pages(metadata))
+
+    builder.add_join(TreeData, TaxonomyData)
+    with pytest.raises(ValueError):
+        list(builder.pages(metadata, key=("serial_number",)))
+
+
+def test_pages_limit_order_by(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder(limit=5)
+    builder.add_column(TreeData, "id")
+    with pytest.raises(ValueError):
+        list(builder.pages(metadata))
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "id")
+    builder.add_order_by(TreeData, "id", descending=True)
+    with pytest.raises(ValueError):
+        list(builder.pages(metadata))
+
+
+def test_aggregate_group_by(metadata):
+    insert_trees(metadata, 6)
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "specie")
+    builder.add_aggregate(TreeData, "id", "count")
+    builder.add_aggregate(TreeData, "diameter_m", "sum", label="total")
+    builder.add_aggregate(TreeData, "diameter_m", "max")
+    builder.add_group_by(TreeData, "specie")
+    builder.add_order_by(TreeData, "specie")
+
+    rows = builder.fetchall(metadata)
+    assert [tuple(row) for row in rows] == [
+        ("Hibiscus abelmoschus", 1, 3.0, 3.0),
+        ("Specie 0", 2, 27.0, 15.0),
+        ("Specie 1", 2, 23.0, 13.0),
+        ("Specie 2", 2, 25.0, 14.0),
+    ]
+    assert rows[0]["count_id"] == 1
+    assert rows[0]["max_diameter_m"] == 3.0
+
+
+def test_aggregate_having(metadata):
+    insert_trees(metadata, 6)
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TaxonomyData, "genus")
+    builder.add_aggregate(TreeData, "diameter_m", "avg")
+    builder.add_join(TreeData, TaxonomyData)
+    builder.add_group_by(TaxonomyData, "genus")
+    builder.add_having(TreeData, "id", "count", 2, ">")
+
+    rows = builder.fetchall(metadata)
+    assert len(rows) == 1
+    assert rows[0]["genus"] == "hibiscus"
+    assert rows[0]["avg_diameter_m"] == pytest.approx(78.0 / 7)
+
+
+def test_aggregate_fetch_columns(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_aggregate(TaxonomyData, "id", "count")
+
+    columns = builder.fetch_columns(metadata)
+    assert columns["count_id"].tolist() == [2]
+    assert columns["count_id"].dtype == "int64"
+
+
+def test_aggregate_invalid(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+
+    with pytest.raises(ValueError):
+        builder.add_aggregate(TreeData, "diameter_m", "median")
+
+    with pytest.raises(ValueError):
+        builder.add_having(TreeData, "diameter_m", "sum", 1.0, "~")
+
+
+def test_count(metadata):
+    insert_trees(metadata, 5)
+
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "serial_number")
+    assert builder.count(metadata) == 6
+
+    builder.add_clause(TreeData, "diameter_m", 12.0, ">")
+    assert builder.count(metadata) == 2
+
+
+def test_count_distinct_limit(metadata):
+    insert_trees(metadata, 5)
+
+    builder = dataclasses_sql.SelectStatementBuilder(distinct=True)
+    builder.add_column(TreeData, "specie")
+    assert builder.count(metadata) == 4
+
+    builder = dataclasses_sql.SelectStatementBuilder(limit=3)
+    builder.add_column(TreeData, "specie")
+    assert builder.count(metadata) == 3
+
+
+def test_count_aggregate_having(metadata):
+    insert_trees(metadata, 5)
+
+    # A single row is aggregated
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_aggregate(TreeData, "diameter_m", "sum")
+    assert builder.count(metadata) == 1
+
+    # Having without group by filters the single aggregated row
+    builder.add_having(TreeData, "id", "count", 10, ">")
+    assert builder.count(metadata) == 0
+
+
+def test_exists(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "serial_number")
+    builder.add_join(TreeData, TaxonomyData)
+    builder.add_clause(TaxonomyData, "genus", "hibiscus")
+    assert builder.exists(metadata)
+
+    builder.add_clause(TreeData, "serial_number", 2)
+    assert not builder.exists(metadata)
+
+
+def test_exists_no_column(metadata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_clause(TreeData, "diameter_m", 1.0, ">")
+    assert builder.exists(metadata)
+
+    builder.add_clause(TreeData, "diameter_m", 100.0, ">")
+    assert not builder.exists(metadata)
+
+
+def test_build_typed(metadata, treedata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "plantation_datetime")
+    builder.add_column(TreeData, "has_flower")
+
+    statement = builder.build(metadata)
+    assert statement.selected_columns[0].table is metadata.tables["treedata"]
+
+    with metadata.bind.begin() as conn:
+        row = conn.execute(statement).fetchone()
+
+    assert row[0] == treedata.plantation_datetime
+    assert row[1] is True
+
+
+def test_build_unknown_table(metadata, treedata):
+    builder = dataclasses_sql.SelectStatementBuilder()
+    builder.add_column(TreeData, "plantation_datetime")
+    builder.add_clause(TreeData, "serial_number", 1)
+
+    # Typed from the fields of the dataclass
+    statement = builder.build(sqlalchemy.MetaData())
+    assert isinstance(statement.selected_columns[0].type, sqlalchemy.DateTime)
+    unknown, _params = builder.prepare(sqlalchemy.MetaData())
+    assert unknown is not builder.prepare(metadata)[0]
+
+    with metadata.bind.begin() as conn:
+        row = conn.execute(statement).fetchone()
+
+    assert row[0] == treedata.plantation_datetime
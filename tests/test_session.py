@@ -0,0 +1,133 @@
+""""""
+
+# Standard library modules.
+
+# Third party modules.
+import pytest
+import sqlalchemy
+
+# Local modules.
+import dataclasses_sql
+from .data import TaxonomyData, TreeData
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def metadata():
+    engine = sqlalchemy.create_engine("sqlite:///:memory:")
+    return sqlalchemy.MetaData(engine)
+
+
+def count_rows(metadata, table_name):
+    with metadata.bind.begin() as conn:
+        return conn.execute(f"select count(*) from {table_name}").scalar()
+
+
+def test_session_add(metadata, treedata):
+    taxonomy = TaxonomyData("plantae", "rosales", "rosaceae", "rosa")
+
+    with dataclasses_sql.Session(metadata) as session:
+        session.add(treedata)
+        session.add_all([taxonomy, treedata.taxonomy])
+
+    assert count_rows(metadata, "treedata") == 1
+    assert count_rows(metadata, "taxonomydata") == 2
+    assert treedata._rowid is not None
+    assert taxonomy._rowid is not None
+
+
+def test_session_update(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+
+    with dataclasses_sql.Session(metadata) as session:
+        treedata.diameter_m = 4.0
+        session.update(treedata)
+
+    with metadata.bind.begin() as conn:
+        row = conn.execute("select * from treedata").fetchone()
+
+    assert row["diameter_m"] == pytest.approx(4.0, abs=1e-4)
+
+
+def test_session_update_no_data(metadata, treedata):
+    with pytest.raises(ValueError):
+        with dataclasses_sql.Session(metadata) as session:
+            session.update(treedata)
+
+
+def test_session_delete(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+
+    with dataclasses_sql.Session(metadata) as session:
+        session.delete(treedata.taxonomy)
+        session.delete(treedata)
+
+    assert count_rows(metadata, "treedata") == 0
+    assert count_rows(metadata, "taxonomydata") == 0
+
+
+def test_session_flush(metadata, treedata):
+    session = dataclasses_sql.Session(metadata)
+    session.add(treedata)
+    session.flush()
+    assert treedata._rowid is not None
+
+    session.update(treedata)
+    session.commit()
+
+    assert count_rows(metadata, "treedata") == 1
+
+
+def test_session_rollback(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata.taxonomy)
+
+    with pytest.raises(RuntimeError):
+        with dataclasses_sql.Session(metadata) as session:
+            session.add(treedata)
+            session.flush()
+            raise RuntimeError
+
+    assert count_rows(metadata, "treedata") == 0
+    assert count_rows(metadata, "taxonomydata") == 1
+
+    # Flushed instances are restored
+    assert not hasattr(treedata, "_rowid")
+    assert not hasattr(treedata, "_snapshot")
+    assert treedata.taxonomy._rowid == 1
+
+
+def test_session_commit_failure(metadata, treedata):
+    @sqlalchemy.event.listens_for(metadata.bind, "commit")
+    def commit(conn):
+        raise RuntimeError
+
+    session = dataclasses_sql.Session(metadata)
+    session.add(treedata)
+
+    with pytest.raises(RuntimeError):
+        session.commit()
+
+    assert session._connection is None
+    assert not hasattr(treedata, "_rowid")
+    assert not hasattr(treedata.taxonomy, "_rowid")
+
+
+def test_session_rollback_update(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+    snapshot = treedata._snapshot
+
+    with pytest.raises(RuntimeError):
+        with dataclasses_sql.Session(metadata) as session:
+            treedata.diameter_m = 5.0
+            session.update(treedata)
+            session.flush()
+            raise RuntimeError
+
+    assert treedata._snapshot == snapshot
+
+    # The instance is updated again as its snapshot was restored
+    assert dataclasses_sql.update(metadata, treedata)
+    with metadata.bind.begin() as conn:
+        diameter_m = conn.execute("select diameter_m from treedata").scalar()
+    assert diameter_m == pytest.approx(5.0)
@@ -1,6 +1,7 @@
 """"""
 
 # Standard library modules.
+import dataclasses
 
 # Third party modules.
 import pytest
@@ -8,6 +9,7 @@ import sqlalchemy
 
 # Local modules.
 import dataclasses_sql
+from .data import TaxonomyData, TreeData
 
 # Globals and constants variables.
 
@@ -53,3 +55,129 @@ def test_update(metadata, treedata):
     assert row["has_flower"]
     assert row["plantation_datetime"] == "2019-07-21 18:54:21.000000"
     assert row["last_pruning_date"] == "2019-08-01"
+
+
+def test_update_unchanged(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+
+    assert not dataclasses_sql.update(metadata, treedata)
+
+
+def test_update_changed_columns(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+
+    # Column only written if changed
+    with metadata.bind.begin() as conn:
+        conn.execute("update treedata set long_description = 'abc'")
+
+    treedata.diameter_m = 4.0
+    assert dataclasses_sql.update(metadata, treedata)
+
+    with metadata.bind.begin() as conn:
+        row = conn.execute("select * from treedata").fetchone()
+
+    assert row["diameter_m"] == pytest.approx(4.0, abs=1e-2)
+    assert row["long_description"] == "abc"
+
+
+def test_update_loaded(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+
+    (other,) = dataclasses_sql.select_objects(metadata, type(treedata))
+    assert not dataclasses_sql.update(metadata, other)
+
+    other.has_flower = False
+    assert dataclasses_sql.update(metadata, other)
+
+    with metadata.bind.begin() as conn:
+        row = conn.execute("select * from treedata").fetchone()
+
+    assert not row["has_flower"]
+
+
+def test_update_nested_existing(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+
+    # Same key fields as the existing taxonomy
+    treedata.taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    assert not dataclasses_sql.update(metadata, treedata)
+
+    with metadata.bind.begin() as conn:
+        count = conn.execute("select count(*) from taxonomydata").scalar()
+
+    assert count == 1
+
+
+def test_update_nested_shared(metadata):
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    trees = [TreeData(i, taxonomy, "Hibiscus abelmoschus") for i in range(3)]
+    dataclasses_sql.insert_many(metadata, trees)
+
+    other = TaxonomyData("plantae", "rosales", "rosaceae", "rosa")
+    with dataclasses_sql.Session(metadata) as session:
+        for treedata in trees:
+            treedata.taxonomy = other
+            session.update(treedata)
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select taxonomy_id from treedata").fetchall()
+        count = conn.execute("select count(*) from taxonomydata").scalar()
+
+    assert count == 2
+    assert set(row[0] for row in rows) == {other._rowid}
+
+
+@dataclasses.dataclass
+class NoteData:
+    text: str = None
+
+
+@dataclasses.dataclass
+class PlantData:
+    serial_number: int = dataclasses.field(metadata={"key": True})
+    note: NoteData = None
+
+
+def test_update_nested_no_key(metadata):
+    plant = PlantData(1, NoteData("planted"))
+    dataclasses_sql.insert(metadata, plant)
+
+    # Nested dataclasses without key fields are always inserted
+    plant.note = NoteData("pruned")
+    assert dataclasses_sql.update(metadata, plant)
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from notedata").fetchall()
+        note_id = conn.execute("select note_id from plantdata").scalar()
+
+    assert len(rows) == 2
+    assert note_id == plant.note._rowid
+
+
+def test_update_many(metadata):
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "hibiscus")
+    trees = [TreeData(i, taxonomy, "Hibiscus abelmoschus") for i in range(10)]
+    dataclasses_sql.insert_many(metadata, trees)
+
+    for treedata in trees[:4]:
+        treedata.diameter_m = 2.0
+    for treedata in trees[4:8]:
+        treedata.has_flower = True
+
+    others = [TreeData(i, taxonomy, "Hibiscus abelmoschus", 3.0) for i in range(8, 10)]
+
+    count = dataclasses_sql.update_many(metadata, trees[:8] + others, chunk_size=3)
+    assert count == 10
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute(
+            "select diameter_m, has_flower from treedata order by serial_number"
+        ).fetchall()
+
+    assert [row[0] for row in rows] == [2.0] * 4 + [None] * 4 + [3.0] * 2
+    assert [row[1] for row in rows] == [None] * 4 + [True] * 4 + [None] * 2
+
+
+def test_update_many_no_data(metadata, treedata):
+    with pytest.raises(ValueError):
+        dataclasses_sql.update_many(metadata, [treedata])
@@ -0,0 +1,134 @@
+""""""
+
+# Standard library modules.
+import dataclasses
+
+# Third party modules.
+import pytest
+import sqlalchemy
+
+# Local modules.
+import dataclasses_sql
+from .data import TaxonomyData, TreeData
+
+# Globals and constants variables.
+
+
+@pytest.fixture
+def metadata():
+    engine = sqlalchemy.create_engine("sqlite:///:memory:")
+    return sqlalchemy.MetaData(engine)
+
+
+def test_upsert(metadata, treedata):
+    rowid = dataclasses_sql.upsert(metadata, treedata)
+    assert rowid == treedata._rowid
+    assert treedata.taxonomy._rowid is not None
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from treedata").fetchall()
+
+    assert len(rows) == 1
+    assert rows[0]["id"] == rowid
+    assert rows[0]["diameter_m"] == pytest.approx(3.0, abs=1e-4)
+
+
+def test_upsert_ignore(metadata, treedata):
+    rowid = dataclasses_sql.upsert(metadata, treedata)
+
+    taxonomy = TaxonomyData("plantae", "malvales", "malvaceae", "HIBISCUS")
+    other = TreeData(1, taxonomy, "Hibiscus abelmoschus", diameter_m=4.0)
+    assert dataclasses_sql.upsert(metadata, other) == rowid
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from treedata").fetchall()
+
+    assert len(rows) == 1
+    assert rows[0]["diameter_m"] == pytest.approx(3.0, abs=1e-4)
+
+
+def test_upsert_update(metadata, treedata):
+    rowid = dataclasses_sql.upsert(metadata, treedata)
+
+    other = TreeData(1, treedata.taxonomy, "Hibiscus abelmoschus", diameter_m=4.0)
+    assert dataclasses_sql.upsert(metadata, other, on_conflict="update") == rowid
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from treedata").fetchall()
+
+    assert len(rows) == 1
+    assert rows[0]["diameter_m"] == pytest.approx(4.0, abs=1e-4)
+
+
+def test_upsert_invalid_on_conflict(metadata, treedata):
+    with pytest.raises(ValueError):
+        dataclasses_sql.upsert(metadata, treedata, on_conflict="replace")
+
+
+def test_upsert_many(metadata, treedata):
+    dataclasses_sql.insert(metadata, treedata)
+
+    taxonomy = TaxonomyData("plantae", "rosales", "rosaceae", "rosa")
+    trees = [
+        TreeData(1, treedata.taxonomy, "Hibiscus abelmoschus", diameter_m=5.0),
+        TreeData(2, taxonomy, "Rosa canina", diameter_m=1.0),
+        TreeData(2, taxonomy, "Rosa canina", diameter_m=2.0),
+    ]
+
+    rowids = dataclasses_sql.upsert_many(metadata, trees, on_conflict="update")
+    assert rowids[0] == treedata._rowid
+    assert rowids[1] == rowids[2]
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from treedata order by id").fetchall()
+
+    assert len(rows) == 2
+    assert rows[0]["diameter_m"] == pytest.approx(5.0, abs=1e-4)
+
+    # The last duplicate is written, as by successive upserts
+    assert rows[1]["diameter_m"] == pytest.approx(2.0, abs=1e-4)
+    assert trees[1]._snapshot == trees[2]._snapshot
+    assert trees[1]._snapshot["diameter_m"] == 2.0
+
+
+def test_upsert_many_ignore_duplicates(metadata):
+    taxonomy = TaxonomyData("plantae", "rosales", "rosaceae", "rosa")
+    trees = [
+        TreeData(2, taxonomy, "Rosa canina", diameter_m=1.0),
+        TreeData(2, taxonomy, "Rosa canina", diameter_m=2.0),
+    ]
+
+    rowids = dataclasses_sql.upsert_many(metadata, trees, on_conflict="ignore")
+    assert rowids[0] == rowids[1]
+
+    with metadata.bind.begin() as conn:
+        diameter_m = conn.execute("select diameter_m from treedata").scalar()
+
+    assert diameter_m == pytest.approx(1.0, abs=1e-4)
+
+
+@dataclasses.dataclass
+class NoteData:
+    text: str = None
+
+
+@dataclasses.dataclass
+class PlantData:
+    serial_number: int = dataclasses.field(metadata={"key": True})
+    note: NoteData = None
+
+
+def test_upsert_nested_no_key(metadata):
+    plant = PlantData(1, NoteData("planted"))
+    rowid = dataclasses_sql.upsert(metadata, plant, on_conflict="update")
+    assert plant.note._rowid is not None
+
+    other = PlantData(1, NoteData("pruned"))
+    assert dataclasses_sql.upsert(metadata, other, on_conflict="update") == rowid
+
+    with metadata.bind.begin() as conn:
+        rows = conn.execute("select * from notedata").fetchall()
+        note_id = conn.execute("select note_id from plantdata").scalar()
+
+    assert len(rows) == 2
+    assert note_id == other.note._rowid